@@ -1,14 +1,23 @@
+import os
+
 # dash imports for the dashboard app
 import dash
 import dash_bootstrap_components as dbc
 from dash import Dash, html
 
+from dashboard.instrument import instrument
+from dashboard.startup import warm_up_in_background
+
 app = Dash(
     __name__,
     external_stylesheets=[dbc.themes.BOOTSTRAP, dbc.themes.LUX],
     use_pages=True,
 )
 
+# callback timings on /metrics, PROFILE_DIR also profiles the requests with the X-Profile header
+# and a PROFILE_SAMPLE_RATE share of all the callback requests
+instrument(app, profile_dir=os.getenv("PROFILE_DIR"), sample_rate=float(os.getenv("PROFILE_SAMPLE_RATE", "0")))
+
 navbar = dbc.NavbarSimple(
     children=[
         dbc.NavItem(dbc.NavLink("Home", href="http://localhost:8050")),
@@ -28,6 +37,14 @@ app.layout = html.Div(
     ],
     className="content",
 )
+# WSGI entry point of the production server, see gunicorn.conf.py
+server = app.server
 
 if __name__ == "__main__":
-    app.run(debug=True)
+    # DASH_DEBUG=false serves the app without the debug reloader
+    debug = os.getenv("DASH_DEBUG", "true").lower() != "false"
+    # plotly, pandas and the datasets are loaded in the background once the server is up,
+    # by the child process of the debug reloader when it serves the app
+    if not debug or os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        warm_up_in_background(app.server, os.getenv("HOST", "127.0.0.1"), int(os.getenv("PORT", "8050")))
+    app.run(debug=debug)
@@ -0,0 +1,144 @@
+"""
+Per-page parsing benchmark of the publication archive pages.
+
+Parses saved archive pages (or synthetic ones shaped like them) with every backend and reports the time per page of
+`PublicationScraper.get_posts` + `get_data`, e.g.
+
+    python benchmarks/archive_parsing.py --pages saved_pages/ --repeat 20
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from medium_scraper import parsing  # noqa: E402
+from scraper import PublicationScraper  # noqa: E402
+
+POST_TEMPLATE = """
+<div class="streamItem streamItem--postPreview js-streamItem">
+  <div class="cardChromeless u-marginTop20 u-paddingTop10 u-paddingBottom15 u-paddingLeft20 u-paddingRight20">
+    <div class="postArticle postArticle--short js-postArticle js-trackPostPresentation" data-post-id="{post_id}">
+      <div class="u-clearfix u-marginBottom15 u-paddingTop5">
+        <div class="postMetaInline u-floatLeft">
+          <div class="u-flexCenter">
+            <div class="postMetaInline-avatar u-flex0">
+              <a class="link u-baseColor--link avatar" href="https://medium.com/@author{i}">
+                <img class="avatar-image" src="https://cdn-images-1.medium.com/fit/c/36/36/{post_id}.jpeg">
+              </a>
+            </div>
+            <div class="postMetaInline postMetaInline-authorLockup ui-captionStrong u-flex1 u-noWrapWithEllipsis">
+              <a class="ds-link link link--darken u-accentColor--textNormal" href="https://medium.com/@author{i}">Author {i}</a>
+              <div class="ui-caption u-fontSize12 u-baseColor--textNormal u-textColorNormal js-postMetaInlineSupplemental">
+                <a class="link link--darken" href="https://example.medium.com/post-{post_id}">
+                  <time datetime="2022-12-{day:02d}T13:01:00.000Z">Dec {day}, 2022</time>
+                </a>
+                <span class="middotDivider u-fontSize12"></span>
+                <span class="readingTime" title="{reading_time} min read"></span>
+              </div>
+            </div>
+          </div>
+        </div>
+      </div>
+      <a href="https://example.medium.com/post-{post_id}?source=collection_archive---------{i}-----------------------">
+        <div class="postArticle-content js-postField">
+          <section class="section section--body section--first section--last">
+            <div class="section-divider"><hr class="section-divider"></div>
+            <div class="section-content"><div class="section-inner sectionLayout--insetColumn">
+              <figure class="graf graf--figure graf--leading"><div class="aspectRatioPlaceholder is-locked">
+                <img class="graf-image" src="https://cdn-images-1.medium.com/fit/t/1600/480/{post_id}.jpeg">
+              </div></figure>
+              <h3 class="graf graf--h3 graf-after--figure graf--title">Post number {i} of the synthetic archive</h3>
+              <h4 class="graf graf--h4 graf-after--h3 graf--trailing graf--subtitle">{subtitle}</h4>
+            </div></div>
+          </section>
+        </div>
+      </a>
+      <div class="u-clearfix u-paddingTop10">
+        <div class="u-floatLeft">
+          <div class="multirecommend js-actionMultirecommend u-flexCenter">
+            <span class="u-relative u-background js-actionMultirecommendCount u-marginLeft5">
+              <button class="button button--chromeless u-baseColor--buttonNormal">{claps}</button>
+            </span>
+          </div>
+        </div>
+      </div>
+    </div>
+  </div>
+</div>
+"""
+
+# the navigation, inline scripts and footer that surround the posts of a real archive page
+CHROME_TEMPLATE = """
+<div class="metabar u-clearfix js-metabar">{links}</div>
+<script>window["obvInit"]({{"config": {{"data": "{payload}"}}}})</script>
+<div class="container u-maxWidth1000">{posts}</div>
+<footer class="footer">{links}</footer>
+<script>window.__GRAPHQL_STATE__ = "{payload}"</script>
+"""
+
+
+def synthetic_archive_page(num_posts=20) -> bytes:
+    posts = "".join(
+        POST_TEMPLATE.format(
+            i=i,
+            post_id="%012x" % (i * 7919),
+            day=i % 28 + 1,
+            reading_time=i % 15 + 1,
+            subtitle="subtitle " * 10,
+            claps="%d.%dK" % (i % 9 + 1, i % 10),
+        )
+        for i in range(num_posts)
+    )
+    links = "".join('<a class="link" href="https://medium.com/tag/%d">tag %d</a>' % (i, i) for i in range(200))
+    page = CHROME_TEMPLATE.format(links=links, payload="x" * 50_000, posts=posts)
+    return ("<html><head><title>Archive</title></head><body>%s</body></html>" % page).encode()
+
+
+def benchmark(pages, extract, repeat):
+    posts = 0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for content in pages:
+            posts += len(extract(content))
+    elapsed = time.perf_counter() - start
+    return elapsed / (repeat * len(pages)), posts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", default=None, help="directory of saved archive pages (*.html), synthetic pages by default")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    if args.pages:
+        pages = []
+        for path in sorted(glob.glob(os.path.join(args.pages, "*.html"))):
+            with open(path, "rb") as f:
+                pages.append(f.read())
+    else:
+        pages = [synthetic_archive_page() for _ in range(5)]
+
+    scraper = PublicationScraper.__new__(PublicationScraper)
+    backends = [
+        # the full tree of the page, as the scraper used to parse it
+        ("bs4 html.parser", lambda content: scraper.get_data(parsing.parse_posts(content, "html.parser", strained=False))),
+        ("bs4 html.parser strained", lambda content: scraper.get_data(parsing.parse_posts(content, "html.parser"))),
+    ]
+    if parsing.BACKEND == "lxml":
+        backends += [
+            ("bs4 lxml strained", lambda content: scraper.get_data(parsing.parse_posts(content, "lxml"))),
+            ("lxml xpath", lambda content: [scraper.post_process(sample) for sample in parsing.extract_posts(content)]),
+        ]
+
+    baseline = None
+    for name, extract in backends:
+        per_page, posts = benchmark(pages, extract, args.repeat)
+        baseline = baseline or per_page
+        print("%-26s %8.2f ms/page  %6d posts  %5.1fx" % (name, per_page * 1000, posts, baseline / per_page))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+"""
+Latency benchmark of the dashboard callbacks on synthetic datasets.
+
+Generates the processed, raw and authors datasets with the schemas of the pipeline at every requested size, points the
+dashboard at them and calls every registered server-side callback through the Dash request handler, without a
+browser. Every callback reports:
+
+    first     latency of the first call after the datasets were reloaded, loading and deriving the tables included
+    cold      p50/p95 latency with the figure cache cleared before every call
+    warm      p50/p95 latency with the figure cache filled
+    bytes     size of the JSON response
+    peak      peak memory allocated by python during a cold call
+
+e.g.
+
+    python benchmarks/callback_latency.py --sizes 1000 100000 --repeat 20 --output callbacks.json
+"""
+import argparse
+import importlib
+import json
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# data processing
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from medium_scraper.schema import DATASETS, RAW_SCHEMA, read_source  # noqa: E402
+from pipeline import aggregate_authors, export_columnar, export_database  # noqa: E402
+
+# input values of the callbacks in the scenarios, the inputs missing from a scenario keep their initial value
+SCENARIOS = {
+    "initial": {},
+    "selected": {
+        ("publications-dropdown", "value"): "https://publication0.medium.com/",
+        ("search_bar", "value"): "author 1",
+        ("authors-table", "sort_by"): [{"column_id": "average_claps", "direction": "desc"}],
+        ("authors-table", "filter_query"): "{num_articles} s> 5",
+    },
+}
+INITIAL_VALUES = {
+    ("search_bar", "value"): "",
+    ("authors-table", "page_current"): 0,
+    ("authors-table", "page_size"): 20,
+    ("authors-table", "sort_by"): [],
+    ("authors-table", "filter_query"): "",
+}
+
+
+def synthetic_datasets(directory, num_posts, num_authors, num_publications, seed=0):
+    """Write the processed, raw and authors datasets with `num_posts` posts into the directory."""
+    rng = np.random.default_rng(seed)
+    authors = np.array(["Author %d Writer%d" % (i, i % 97) for i in range(num_authors)], dtype=object)
+    publications = np.array(["https://publication%d.medium.com/" % i for i in range(num_publications)], dtype=object)
+    dates = pd.Timestamp("2019-01-01") + pd.to_timedelta(rng.integers(0, 4 * 365 * 86400, num_posts), unit="s")
+    # a few prolific authors and publications, like the real datasets
+    author = rng.zipf(1.5, num_posts) % num_authors
+    publication = rng.zipf(1.5, num_posts) % num_publications
+
+    processed = pd.DataFrame(
+        {
+            "publication_url": publications[publication],
+            "author": authors[author],
+            "date": dates.strftime("%Y-%m-%d"),
+            "reading_time": rng.integers(1, 20, num_posts),
+            "title": ["Synthetic post number %d" % i for i in range(num_posts)],
+            "claps": np.round(rng.pareto(1.2, num_posts) * 100),
+        }
+    )
+    processed.to_csv(os.path.join(directory, DATASETS["processed"]["filename"]), index=False)
+
+    raw = pd.DataFrame(
+        {
+            "author": authors[author],
+            "author_avatar_url": ["https://miro.medium.com/1*avatar%d.jpeg" % i for i in author],
+            "membership_date": (pd.Timestamp("2018-01-01") + pd.to_timedelta(author, unit="D")).strftime("%Y-%m-%d %H:%M:%S"),
+            "author_bio": ["Bio of the author number %d" % i for i in author],
+            "num_followers": author * 37 % 100_000,
+            "v3_newsletter_subs": author * 13 % 5_000,
+            "date": dates.strftime("%Y-%m-%d %H:%M:%S"),
+            "reading_time": rng.integers(1, 20, num_posts).astype("float64"),
+            "title": ["Synthetic post number %d" % i for i in range(num_posts)],
+            "post_url": ["https://medium.com/p/%012x" % i for i in range(num_posts)],
+            "claps": rng.integers(0, 10_000, num_posts),
+            "num_unique_clappers": rng.integers(0, 1_000, num_posts),
+            "image_url": ["https://miro.medium.com/1*%012x.jpeg" % i for i in range(num_posts)],
+            "num_responses": rng.integers(0, 100, num_posts),
+            "tags": [str(["tag%d" % (i % 50), "tag%d" % (i % 7)]) for i in range(num_posts)],
+            "author_url": ["https://author%d.medium.com/" % i for i in author],
+        },
+        columns=list(RAW_SCHEMA),
+    )
+    raw_path = os.path.join(directory, DATASETS["raw"]["filename"])
+    raw.to_csv(raw_path, index=False)
+
+    aggregate_authors(read_source(raw_path, "raw")).to_csv(os.path.join(directory, DATASETS["authors"]["filename"]), index=False)
+
+
+def rss_mb():
+    # ru_maxrss is in bytes on macOS and in kilobytes everywhere else
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def request_body(key, callback, scenario):
+    if key.startswith(".."):
+        outputs = [dict(zip(("id", "property"), output.split("."))) for output in key.strip(".").split("...")]
+    else:
+        outputs = dict(zip(("id", "property"), key.split(".")))
+    inputs = []
+    for item in callback["inputs"]:
+        prop = (item["id"], item["property"])
+        inputs.append({**item, "value": scenario.get(prop, INITIAL_VALUES.get(prop))})
+    return {"output": key, "outputs": outputs, "inputs": inputs, "changedPropIds": [], "state": callback.get("state", [])}
+
+
+def percentiles(latencies):
+    p50, p95 = np.percentile(np.array(latencies) * 1000, [50, 95])
+    return round(float(p50), 3), round(float(p95), 3)
+
+
+def benchmark(dash_app, store, figure_cache, repeat):
+    client = dash_app.server.test_client()
+    client.get("/")
+
+    results = []
+    for key, callback in dash_app.callback_map.items():
+        # the page routing of dash and the clientside callbacks are not ours to measure
+        if key.startswith(".._pages") or key.startswith("_pages") or "callback" not in callback:
+            continue
+        for name, scenario in SCENARIOS.items():
+            if name != "initial" and not any((item["id"], item["property"]) in scenario for item in callback["inputs"]):
+                continue
+            body = request_body(key, callback, scenario)
+
+            def call():
+                start = time.perf_counter()
+                response = client.post("/_dash-update-component", json=body)
+                elapsed = time.perf_counter() - start
+                if response.status_code not in (200, 204):
+                    raise RuntimeError("%s failed with %d: %s" % (key, response.status_code, response.get_data(as_text=True)[:200]))
+                return elapsed, len(response.get_data())
+
+            store.reload()
+            first, size = call()
+
+            cold = []
+            for _ in range(repeat):
+                figure_cache.clear()
+                cold.append(call()[0])
+            warm = [call()[0] for _ in range(repeat)]
+
+            figure_cache.clear()
+            tracemalloc.start()
+            call()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            result = {
+                "callback": callback["callback"].__name__,
+                "scenario": name,
+                "first_ms": round(first * 1000, 3),
+                "cold_p50_ms": percentiles(cold)[0],
+                "cold_p95_ms": percentiles(cold)[1],
+                "warm_p50_ms": percentiles(warm)[0],
+                "warm_p95_ms": percentiles(warm)[1],
+                "bytes": size,
+                "peak_alloc_mb": round(peak / (1024 * 1024), 2),
+            }
+            print(
+                "%-24s %-9s first %8.1f ms  cold p50 %8.1f p95 %8.1f ms  warm p50 %6.1f p95 %6.1f ms  %9d B  %7.1f MB"
+                % (
+                    result["callback"],
+                    name,
+                    result["first_ms"],
+                    result["cold_p50_ms"],
+                    result["cold_p95_ms"],
+                    result["warm_p50_ms"],
+                    result["warm_p95_ms"],
+                    size,
+                    result["peak_alloc_mb"],
+                )
+            )
+            results.append(result)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000], help="number of posts of every run")
+    parser.add_argument("--authors", type=int, default=None, help="number of authors (default: posts / 20)")
+    parser.add_argument("--publications", type=int, default=10, help="number of publications")
+    parser.add_argument("--repeat", type=int, default=20, help="calls of every callback per measurement")
+    parser.add_argument("--csv-only", action="store_true", help="skip the Feather and SQLite exports of the pipeline")
+    parser.add_argument("--output", default=None, help="JSON file the results are written to")
+    args = parser.parse_args()
+
+    runs = []
+    with tempfile.TemporaryDirectory() as root:
+        directories = [os.path.join(root, str(size)) for size in args.sizes]
+        # the dashboard reads its dataset and cache directories when it is imported, clearing the figure cache
+        # between the cold calls must not wipe the disk or Redis tiers the servers of the host share
+        os.environ["DATASET_PATH"] = directories[0]
+        os.environ["CACHE_DIR"] = os.path.join(root, "figures")
+        os.environ["CACHE_REDIS_URL"] = ""
+        dash_app, store, figure_cache = None, None, None
+
+        for size, directory in zip(args.sizes, directories):
+            os.makedirs(directory)
+            num_authors = args.authors or max(size // 20, 1)
+            synthetic_datasets(directory, size, num_authors, args.publications)
+            if not args.csv_only:
+                export_columnar(directory)
+                export_database(directory)
+
+            if dash_app is None:
+                dash_app = importlib.import_module("app").app
+                store = importlib.import_module("dashboard").dataset_store
+                figure_cache = importlib.import_module("dashboard.figures").figure_cache
+            store.dataset_dir = directory
+
+            print("%d posts, %d authors, %d publications" % (size, num_authors, args.publications))
+            callbacks = benchmark(dash_app, store, figure_cache, args.repeat)
+            run = {"posts": size, "authors": num_authors, "publications": args.publications, "rss_mb": round(rss_mb(), 1)}
+            runs.append({**run, "callbacks": callbacks})
+            print("peak RSS %.1f MB" % runs[-1]["rss_mb"])
+
+    if args.output:
+        results = {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "runs": runs,
+        }
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print("Saved the results to %s" % args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""
+Throughput benchmark of the scraping stages, from the fetched responses to the written dataset.
+
+Runs every stage over a corpus of saved archive pages (*.html) and GraphQL profile responses (*.json), or synthetic
+ones shaped like them, optionally repeated to scale the corpus up, and reports the posts per second, the time and the
+peak memory allocated by python of every stage, measured in a second traced run of the stage so the tracing does not
+slow down the timed one (the buffers pyarrow allocates itself are not traced):
+
+    archive get_data       PublicationScraper.get_posts + get_data with BeautifulSoup
+    archive post_process   lxml extraction + PublicationScraper.post_process
+    profile extract        orjson decoding of the GraphQL responses + ProfileScraper field mapping
+    pipeline normalize     pipeline.normalize of the profile posts into raw dataset rows
+    write csv/parquet      chunked writers of the raw dataset
+
+e.g.
+
+    python benchmarks/scraper_throughput.py --scale 1 10 100 --output results.json
+
+With `--compare` the throughput of every stage is checked against a previous results file, and the script exits with
+an error when a stage got slower than the tolerance.
+"""
+import argparse
+import glob
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import orjson
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from archive_parsing import synthetic_archive_page  # noqa: E402
+
+from medium_scraper import parsing  # noqa: E402
+from medium_scraper.profile import post_fields  # noqa: E402
+from medium_scraper.schema import RAW_SCHEMA  # noqa: E402
+from medium_scraper.writers import open_writer  # noqa: E402
+from pipeline import normalize  # noqa: E402
+from scraper import PublicationScraper  # noqa: E402
+
+PROFILE_URL = "https://author%d.medium.com/"
+
+
+def synthetic_profile_response(author=0, num_posts=10) -> bytes:
+    """A batched GraphQL response with one `UserProfileQuery` result, shaped like the ones of medium.com."""
+    posts = [
+        {
+            "id": "%012x" % (author * 1000 + i),
+            "title": "Post number %d of the synthetic profile" % i,
+            "mediumUrl": "https://medium.com/@author%d/post-%012x" % (author, author * 1000 + i),
+            "firstPublishedAt": 1679639573325 - i * 86_400_000,
+            "readingTime": 4.2 + i % 7,
+            "clapCount": 1000 + i * 17,
+            "voterCount": 100 + i,
+            "previewImage": {"id": "1*%012x.jpeg" % i, "focusPercentX": None, "focusPercentY": None, "__typename": "ImageMetadata"},
+            "postResponses": {"count": i % 30, "__typename": "PostResponses"},
+            "tags": [{"id": tag, "__typename": "Tag"} for tag in ("life", "self-improvement", "tag%d" % (i % 5))],
+            "creator": {"id": "%x" % author, "newsletterV3": {"id": "n%x" % author, "subscribersCount": 3373}, "__typename": "User"},
+            "__typename": "Post",
+        }
+        for i in range(num_posts)
+    ]
+    user = {
+        "__typename": "User",
+        "id": "%x" % author,
+        "name": "Author %d" % author,
+        "bio": "Writer of the synthetic profile number %d. " % author * 3,
+        "imageId": "1*avatar%d.jpeg" % author,
+        "mediumMemberAt": 1633614947000,
+        "socialStats": {"followerCount": 314216, "followingCount": 12, "__typename": "SocialStats"},
+        "homepagePostsConnection": {
+            "posts": posts,
+            "pagingInfo": {"next": {"from": "L%d" % (1679639573325 - num_posts * 86_400_000), "limit": num_posts}},
+        },
+    }
+    return orjson.dumps([{"data": {"userResult": user}}])
+
+
+def load_corpus(directory):
+    pages, responses = [], []
+    for path in sorted(glob.glob(os.path.join(directory, "*.html"))):
+        with open(path, "rb") as f:
+            pages.append(f.read())
+    for path in sorted(glob.glob(os.path.join(directory, "*.json"))):
+        with open(path, "rb") as f:
+            responses.append(f.read())
+    return pages, responses
+
+
+def profile_extract(responses):
+    posts = []
+    for author, body in enumerate(responses):
+        for result in orjson.loads(body):
+            user = result["data"]["userResult"]
+            posts += [post_fields(post, user, PROFILE_URL % author) for post in user["homepagePostsConnection"]["posts"]]
+    return posts
+
+
+def write_rows(rows, format, chunk_size):
+    with tempfile.TemporaryDirectory() as directory:
+        with open_writer(os.path.join(directory, "raw_dataset.%s" % format), RAW_SCHEMA, format, chunk_size) as writer:
+            for row in rows:
+                writer.write(row)
+            return writer.written
+
+
+def run_stage(name, func, *args):
+    start = time.perf_counter()
+    output = func(*args)
+    elapsed = time.perf_counter() - start
+    posts = output if isinstance(output, int) else len(output)
+
+    # the memory of the stage alone, the output of the timed run stays allocated but is not traced
+    tracemalloc.start()
+    func(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    stage = {
+        "stage": name,
+        "posts": posts,
+        "seconds": round(elapsed, 6),
+        "posts_per_sec": round(posts / elapsed, 1) if elapsed else None,
+        "peak_alloc_mb": round(peak / (1024 * 1024), 2),
+    }
+    print("%-22s %8d posts %9.3f s %11.0f posts/s %8.1f MB" % (name, posts, elapsed, stage["posts_per_sec"] or 0, stage["peak_alloc_mb"]))
+    return stage, output
+
+
+def benchmark(pages, responses, chunk_size):
+    scraper = PublicationScraper.__new__(PublicationScraper)
+    stages = []
+
+    stage, _ = run_stage("archive get_data", lambda: [post for page in pages for post in scraper.get_data(parsing.parse_posts(page))])
+    stages.append(stage)
+    if parsing.BACKEND == "lxml":
+        stage, _ = run_stage(
+            "archive post_process", lambda: [scraper.post_process(sample) for page in pages for sample in parsing.extract_posts(page)]
+        )
+        stages.append(stage)
+
+    stage, posts = run_stage("profile extract", profile_extract, responses)
+    stages.append(stage)
+    stage, rows = run_stage("pipeline normalize", lambda: [normalize(post, post["author_url"]) for post in posts])
+    stages.append(stage)
+    for format in ("csv", "parquet"):
+        stage, _ = run_stage("write %s" % format, write_rows, rows, format, chunk_size)
+        stages.append(stage)
+    return stages
+
+
+def compare(runs, baseline, tolerance):
+    """Print the throughput of every stage relative to the baseline results, return the stages slower than the tolerance."""
+    previous = {(run["scale"], stage["stage"]): stage for run in baseline["runs"] for stage in run["stages"]}
+    regressions = []
+    for run in runs:
+        for stage in run["stages"]:
+            before = previous.get((run["scale"], stage["stage"]))
+            if not before or not before["posts_per_sec"] or not stage["posts_per_sec"]:
+                continue
+            ratio = stage["posts_per_sec"] / before["posts_per_sec"]
+            print("x%-4d %-22s %5.2fx of the baseline throughput" % (run["scale"], stage["stage"], ratio))
+            if ratio < 1 - tolerance:
+                regressions.append("x%d %s" % (run["scale"], stage["stage"]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=None, help="directory of saved archive pages (*.html) and GraphQL responses (*.json)")
+    parser.add_argument("--scale", type=int, nargs="+", default=[1], help="times the corpus is repeated, one run per factor")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="rows per written CSV chunk or parquet row group")
+    parser.add_argument("--output", default=None, help="JSON file the results are written to")
+    parser.add_argument("--compare", default=None, help="JSON results of a previous run to check the throughput against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="slowdown of a stage that counts as a regression")
+    args = parser.parse_args()
+
+    if args.corpus:
+        pages, responses = load_corpus(args.corpus)
+    else:
+        pages = [synthetic_archive_page() for _ in range(5)]
+        responses = [synthetic_profile_response(author, num_posts=25) for author in range(20)]
+
+    runs = []
+    for scale in args.scale:
+        print("corpus x%d: %d archive pages, %d GraphQL responses" % (scale, len(pages) * scale, len(responses) * scale))
+        runs.append({"scale": scale, "stages": benchmark(pages * scale, responses * scale, args.chunk_size)})
+
+    if args.output:
+        results = {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "corpus": args.corpus or "synthetic",
+            "runs": runs,
+        }
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print("Saved the results to %s" % args.output)
+
+    if args.compare:
+        with open(args.compare, "r") as f:
+            regressions = compare(runs, json.load(f), args.tolerance)
+        if regressions:
+            sys.exit("Throughput regressions: %s" % ", ".join(regressions))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Cold start benchmark of the dashboard.
+
+Every run starts `app.py` in a fresh process and reports:
+
+    first byte    seconds from the start of the process until the first response of the index page
+    warmed up     seconds until the background warm-up loaded the datasets and rendered the initial figures
+    imports       the import time of `app`, from `python -X importtime`, by top-level package
+
+e.g.
+
+    python benchmarks/startup_time.py --runs 5 --output startup.json
+
+`--debug` serves the app with the debug reloader, which imports the app twice, in the reloader and in the server.
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import signal
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+
+# data processing
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IMPORT_TIME = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| *(\S+)$")
+WARMED_UP = re.compile(r"Warmed up the dashboard in")
+
+
+def import_times(module="app"):
+    """Self and cumulative microseconds of every module imported by `module`, in the order they finished importing."""
+    output = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import %s" % module], cwd=ROOT, capture_output=True, text=True, check=True
+    ).stderr
+    modules = []
+    for line in output.splitlines():
+        match = IMPORT_TIME.match(line)
+        if match:
+            own, cumulative, name = match.groups()
+            modules.append({"module": name, "self_us": int(own), "cumulative_us": int(cumulative)})
+    return modules
+
+
+def by_package(modules) -> dict:
+    packages = {}
+    for module in modules:
+        package = module["module"].split(".")[0]
+        packages[package] = packages.get(package, 0) + module["self_us"]
+    return dict(sorted(packages.items(), key=lambda item: -item[1]))
+
+
+def start_server(port, debug, timeout=60.0):
+    """Start app.py, return the process, the seconds until its first response and a dict that gets the warm-up seconds."""
+    env = dict(os.environ, PORT=str(port), DASH_DEBUG="true" if debug else "false")
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "app.py"], cwd=ROOT, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, start_new_session=True
+    )
+    warmed_up = {}
+
+    def read_output():
+        for line in process.stdout:
+            if WARMED_UP.search(line):
+                warmed_up["seconds"] = time.perf_counter() - start
+
+    threading.Thread(target=read_output, daemon=True).start()
+    while time.perf_counter() - start < timeout:
+        try:
+            urllib.request.urlopen("http://127.0.0.1:%d/" % port, timeout=timeout).read(1)
+            return process, time.perf_counter() - start, warmed_up
+        except (urllib.error.URLError, ConnectionError):
+            if process.poll() is not None:
+                raise RuntimeError("app.py exited with %d" % process.returncode)
+            time.sleep(0.01)
+    raise TimeoutError("app.py did not respond in %.0fs" % timeout)
+
+
+def stop_server(process):
+    # the debug reloader serves the app from a child process of its own session
+    os.killpg(process.pid, signal.SIGTERM)
+    process.wait()
+
+
+def run(port, debug, warm_up_timeout=60.0):
+    process, first_byte, warmed_up = start_server(port, debug)
+    try:
+        deadline = time.perf_counter() + warm_up_timeout
+        while "seconds" not in warmed_up and time.perf_counter() < deadline and process.poll() is None:
+            time.sleep(0.05)
+    finally:
+        stop_server(process)
+    return first_byte, warmed_up.get("seconds")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="cold starts to measure")
+    parser.add_argument("--port", type=int, default=8070, help="port the app is served on")
+    parser.add_argument("--debug", action="store_true", help="serve with the debug reloader")
+    parser.add_argument("--top", type=int, default=15, help="packages shown in the import time breakdown")
+    parser.add_argument("--output", default=None, help="JSON file the results are written to")
+    args = parser.parse_args()
+
+    first_bytes, warm_ups, packages = [], [], []
+    for i in range(args.runs):
+        first_byte, warmed_up = run(args.port, args.debug)
+        first_bytes.append(first_byte)
+        if warmed_up is not None:
+            warm_ups.append(warmed_up)
+        modules = import_times()
+        packages.append(by_package(modules))
+        print(
+            "run %d: first byte %.3f s, warmed up %s, import app %.3f s"
+            % (i + 1, first_byte, "%.3f s" % warmed_up if warmed_up is not None else "-", modules[-1]["cumulative_us"] / 1e6)
+        )
+
+    # median self time of every package over the runs
+    names = {name for run in packages for name in run}
+    breakdown = {name: float(np.median([run.get(name, 0) for run in packages])) for name in names}
+    breakdown = dict(sorted(breakdown.items(), key=lambda item: -item[1]))
+    print("first byte p50 %.3f s, warmed up p50 %s" % (np.median(first_bytes), "%.3f s" % np.median(warm_ups) if warm_ups else "-"))
+    print("import time of app by package:")
+    for name, microseconds in list(breakdown.items())[: args.top]:
+        print("  %-32s %8.1f ms" % (name, microseconds / 1000))
+
+    if args.output:
+        results = {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "debug": args.debug,
+            "first_byte_s": first_bytes,
+            "warmed_up_s": warm_ups,
+            "import_us_by_package": breakdown,
+        }
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print("Saved the results to %s" % args.output)
+
+
+if __name__ == "__main__":
+    main()
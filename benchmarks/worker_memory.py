@@ -0,0 +1,145 @@
+"""
+Memory benchmark of the production server of the dashboard, Linux only.
+
+Serves the app with `gunicorn app:server` and one worker, then with `--workers` workers. Every callback of the app
+is requested with its initial inputs `--rounds` times so that every worker renders the pages, then the memory of the
+master and of every worker is read from /proc/<pid>/smaps_rollup:
+
+    rss        resident memory, counting the pages shared with the other processes in full
+    pss        resident memory, counting the shared pages split between the processes that share them
+    private    pages only this process uses, i.e. the memory it copied on write or allocated itself
+
+The memory per extra worker is the growth of the total PSS from one worker to `--workers` workers, divided by the
+extra workers, e.g.
+
+    python benchmarks/worker_memory.py --workers 4 --output memory.json
+"""
+import argparse
+import json
+import os
+import platform
+import signal
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def memory(pid) -> dict:
+    """Rss, Pss and private memory of a process in MB."""
+    fields = {}
+    with open("/proc/%d/smaps_rollup" % pid) as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1]) / 1024
+    return {"rss": fields["Rss"], "pss": fields["Pss"], "private": fields["Private_Clean"] + fields["Private_Dirty"]}
+
+
+def children(pid) -> list:
+    with open("/proc/%d/task/%d/children" % (pid, pid)) as f:
+        return [int(child) for child in f.read().split()]
+
+
+def request(url, body=None, timeout=60.0):
+    data = json.dumps(body).encode() if body is not None else None
+    headers = {"Content-Type": "application/json"}
+    with urllib.request.urlopen(urllib.request.Request(url, data=data, headers=headers), timeout=timeout) as response:
+        return response.read()
+
+
+def start_server(port, workers, timeout=120.0):
+    env = dict(os.environ, PORT=str(port), HOST="127.0.0.1", WEB_CONCURRENCY=str(workers))
+    process = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "app:server"], cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        try:
+            request("http://127.0.0.1:%d/" % port)
+            # every worker is forked once the master is warmed up, they only need to start accepting
+            if len(children(process.pid)) == workers:
+                return process
+        except (urllib.error.URLError, ConnectionError):
+            if process.poll() is not None:
+                raise RuntimeError("gunicorn exited with %d" % process.returncode)
+        time.sleep(0.1)
+    raise TimeoutError("gunicorn did not serve %d workers in %.0fs" % (workers, timeout))
+
+
+def render_pages(port, rounds):
+    """Request every server-side callback with the inputs of the first load of its page."""
+    base = "http://127.0.0.1:%d" % port
+    dependencies = json.loads(request(base + "/_dash-dependencies"))
+    for _ in range(rounds):
+        for path in ("/", "/authors", "/publications"):
+            request(base + path)
+        for dependency in dependencies:
+            if dependency.get("clientside_function"):
+                continue
+            output = dependency["output"]
+            if output.startswith(".."):
+                outputs = [dict(zip(("id", "property"), o.rsplit(".", 1))) for o in output.strip(".").split("...")]
+            else:
+                outputs = dict(zip(("id", "property"), output.rsplit(".", 1)))
+            body = {
+                "output": output,
+                "outputs": outputs,
+                "inputs": [dict(i, value=None) for i in dependency["inputs"]],
+                "state": [dict(s, value=None) for s in dependency["state"]],
+                "changedPropIds": [],
+            }
+            request(base + "/_dash-update-component", body)
+
+
+def measure(port, workers, rounds):
+    process = start_server(port, workers)
+    try:
+        render_pages(port, rounds)
+        master = memory(process.pid)
+        worker_memory = [memory(pid) for pid in children(process.pid)]
+    finally:
+        process.send_signal(signal.SIGTERM)
+        process.wait()
+    total = master["pss"] + sum(worker["pss"] for worker in worker_memory)
+    return {"workers": workers, "master": master, "worker_memory": worker_memory, "total_pss": total}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="workers of the second server")
+    parser.add_argument("--rounds", type=int, default=5, help="page loads spread over the workers")
+    parser.add_argument("--port", type=int, default=8071, help="port the app is served on")
+    parser.add_argument("--output", default=None, help="JSON file the results are written to")
+    args = parser.parse_args()
+
+    results = []
+    for workers in sorted({1, args.workers}):
+        result = measure(args.port, workers, args.rounds * workers)
+        results.append(result)
+        print("%d worker(s): total PSS %.1f MB, master RSS %.1f MB" % (workers, result["total_pss"], result["master"]["rss"]))
+        for i, worker in enumerate(result["worker_memory"]):
+            print("  worker %d: RSS %7.1f MB  PSS %7.1f MB  private %7.1f MB" % (i + 1, worker["rss"], worker["pss"], worker["private"]))
+
+    if len(results) > 1:
+        single, multiple = results
+        per_worker = (multiple["total_pss"] - single["total_pss"]) / (multiple["workers"] - 1)
+        print("memory per extra worker %.1f MB" % per_worker)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            results = {
+                "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "runs": results,
+            }
+            json.dump(results, f, indent=2)
+        print("Saved the results to %s" % args.output)
+
+
+if __name__ == "__main__":
+    main()
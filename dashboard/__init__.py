@@ -0,0 +1,22 @@
+__all__ = ["DatasetStore", "dataset_store", "load"]
+
+
+def load():
+    """
+    Import the dataset store with the derived tables registered on it. The store, pandas and the derived tables are
+    only imported by the first callback that reads them, so the app starts serving without waiting for them.
+    The store is then also `dashboard.dataset_store`, `dashboard.store` stays the module it is defined in.
+    """
+    # the derived tables register themselves on the store when imported
+    from dashboard import aggregates, rankings, search  # noqa: F401
+    from dashboard.store import DatasetStore, store
+
+    globals().update(DatasetStore=DatasetStore, dataset_store=store)
+    return store
+
+
+def __getattr__(name):
+    if name in ("DatasetStore", "dataset_store"):
+        load()
+        return globals()[name]
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
@@ -0,0 +1,27 @@
+# data processing
+import pandas as pd
+
+from dashboard.store import store
+
+# minimum approximation of the earnings per clap, generally ranges between 0.01-5 usd
+EARNINGS_PER_CLAP = 0.1
+
+
+def _aggregate(grouped) -> pd.DataFrame:
+    table = grouped.agg(
+        num_articles=("claps", "size"),
+        total_claps=("claps", "sum"),
+        avg_claps=("claps", "mean"),
+        total_reading_time=("reading_time", "sum"),
+        avg_reading_time=("reading_time", "mean"),
+    )
+    table["earnings"] = table["total_claps"] * EARNINGS_PER_CLAP
+    return table.sort_index()
+
+
+def publication_summary(dataset: pd.DataFrame) -> pd.DataFrame:
+    """Counts, sums, means and clap-based earnings of every publication, indexed by the publication url."""
+    return _aggregate(dataset.groupby(dataset["publication_url"].astype(str)))
+
+
+store.register("publication_summary", publication_summary, source="processed")
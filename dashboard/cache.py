@@ -0,0 +1,199 @@
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+from medium_scraper.filestore import FileStore
+from medium_scraper.metrics import registry
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+# bounds of the in-process and the on-disk tiers
+MEMORY_BYTES = 64 * 1024 * 1024
+DISK_BYTES = 512 * 1024 * 1024
+# directory of the on-disk tier, shared by every worker of the host
+CACHE_DIR = os.getenv("CACHE_DIR", os.path.join(tempfile.gettempdir(), "medium-dashboard-cache"))
+# a Redis-compatible server replaces the on-disk tier when set, e.g. redis://localhost:6379/0
+REDIS_URL = os.getenv("CACHE_REDIS_URL")
+
+LOOKUPS = registry.counter("dashboard_cache_lookups_total", "Lookups of every tier of the cache.", ["tier", "result"])
+EVICTIONS = registry.counter("dashboard_cache_evictions_total", "Entries evicted from every tier of the cache.", ["tier"])
+
+
+class Tier:
+    name = None
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _hit(self):
+        self.hits += 1
+        LOOKUPS.inc(tier=self.name, result="hit")
+
+    def _miss(self):
+        self.misses += 1
+        LOOKUPS.inc(tier=self.name, result="miss")
+
+    def _evicted(self, count=1):
+        self.evictions += count
+        EVICTIONS.inc(count, tier=self.name)
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+
+class MemoryTier(Tier):
+    """LRU of the values in the memory of the process, bounded by the bytes of the values."""
+
+    name = "memory"
+
+    def __init__(self, max_bytes=MEMORY_BYTES):
+        super().__init__()
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self._miss()
+                return None
+            self._entries.move_to_end(key)
+            self._hit()
+            return value
+
+    def put(self, key, value: str):
+        with self._lock:
+            if key in self._entries:
+                self.size -= len(self._entries.pop(key))
+            self._entries[key] = value
+            self.size += len(value)
+            while self.size > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+                self._evicted()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def stats(self) -> dict:
+        return {**super().stats(), "entries": len(self._entries), "bytes": self.size}
+
+
+class DiskTier(Tier):
+    """
+    Files of the values in a directory shared by the processes of the host, named by the sha256 of their key.
+    The directory is a `FileStore`, bounded by `max_bytes` with the least recently read entries evicted first.
+    """
+
+    name = "disk"
+
+    def __init__(self, directory=CACHE_DIR, max_bytes=DISK_BYTES):
+        super().__init__()
+        self.files = FileStore(directory, max_bytes)
+
+    @staticmethod
+    def key(key):
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    def get(self, key):
+        content = self.files.read(self.key(key))
+        if content is None:
+            self._miss()
+            return None
+        # the modification time is the recency of the entry for the eviction
+        self.files.touch(self.key(key))
+        self._hit()
+        return content.decode()
+
+    def put(self, key, value: str):
+        evicted = self.files.write(self.key(key), value.encode())
+        if evicted:
+            self._evicted(evicted)
+
+    def clear(self):
+        self.files.clear()
+
+    def stats(self) -> dict:
+        return {**super().stats(), "bytes": self.files.size}
+
+
+class RedisTier(Tier):
+    """Values in a Redis-compatible server shared by the workers, which evicts them by its own `maxmemory-policy`."""
+
+    name = "redis"
+
+    def __init__(self, url=REDIS_URL, prefix="medium-dashboard:", ttl=None):
+        super().__init__()
+        if redis is None:
+            raise ImportError("The redis package is needed for a Redis cache tier.")
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self.ttl = ttl
+
+    def key(self, key):
+        return self.prefix + hashlib.sha256(key.encode()).hexdigest()
+
+    def get(self, key):
+        value = self.client.get(self.key(key))
+        if value is None:
+            self._miss()
+            return None
+        self._hit()
+        return value.decode()
+
+    def put(self, key, value: str):
+        self.client.set(self.key(key), value.encode(), ex=self.ttl)
+
+    def clear(self):
+        for key in self.client.scan_iter(self.prefix + "*"):
+            self.client.delete(key)
+
+
+class TieredCache:
+    """
+    String values looked up in every tier in order, a hit in a slower tier is copied into the faster ones.
+    The keys are expected to include a fingerprint of the data the values were computed from, so the entries of
+    outdated data are never read again and just age out of the tiers.
+    """
+
+    def __init__(self, tiers):
+        self.tiers = list(tiers)
+
+    def get(self, key):
+        for i, tier in enumerate(self.tiers):
+            value = tier.get(key)
+            if value is not None:
+                for faster in self.tiers[:i]:
+                    faster.put(key, value)
+                return value
+        return None
+
+    def put(self, key, value: str):
+        for tier in self.tiers:
+            tier.put(key, value)
+
+    def clear(self, shared=True):
+        """Drop the entries of every tier, or only the ones of this process without `shared`."""
+        for tier in self.tiers:
+            if shared or isinstance(tier, MemoryTier):
+                tier.clear()
+
+    def stats(self) -> dict:
+        return {tier.name: tier.stats() for tier in self.tiers}
+
+
+def default_cache() -> TieredCache:
+    """The in-process LRU in front of the Redis server of `CACHE_REDIS_URL`, or of the directory of `CACHE_DIR`."""
+    shared = RedisTier(REDIS_URL) if REDIS_URL else DiskTier(CACHE_DIR)
+    return TieredCache([MemoryTier(), shared])
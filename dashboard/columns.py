@@ -0,0 +1,15 @@
+# constants of the page layouts, kept apart from the tables so that importing the pages does not import pandas
+
+# columns of the author table on the Authors page
+TABLE_COLUMNS = [
+    "author",
+    "num_articles",
+    "num_followers",
+    "average_claps",
+    "average_unique_clappers",
+    "average_reading_time",
+    "average_responses",
+    "v3_newsletter_subs",
+    "membership_date",
+]
+PAGE_SIZE = 20
@@ -0,0 +1,64 @@
+# data processing
+import numpy as np
+import pandas as pd
+
+# most points a scatter plot sends to the browser, larger selections are decimated down to it
+MAX_POINTS = 2000
+# scatter plots with more points than this are drawn with WebGL
+WEBGL_THRESHOLD = 1000
+
+
+def lttb(x, y, threshold):
+    """
+    Indices of the `threshold` points kept by Largest-Triangle-Three-Buckets decimation of the sorted series.
+
+    The first and last points are always kept. Every bucket in between keeps the point that forms the largest triangle
+    with the previously kept point and the average of the next bucket, which preserves the peaks and the overall shape.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start, next_end = (edges[i + 1], edges[i + 2]) if i + 2 < len(edges) else (n - 1, n)
+        avg_x, avg_y = x[next_start:next_end].mean(), y[next_start:next_end].mean()
+
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def downsample(df: pd.DataFrame, x, y, max_points=MAX_POINTS) -> pd.DataFrame:
+    """Rows of the frame sorted by `x`, decimated with LTTB on the `y` column when there are more than `max_points`."""
+    df = df.dropna(subset=[x, y])
+    # lttb buckets the points by position, so they have to be in x order
+    if not df[x].is_monotonic_increasing:
+        df = df.sort_values(x, kind="stable")
+    if len(df) <= max_points:
+        return df
+    values = df[x].astype("int64") if pd.api.types.is_datetime64_any_dtype(df[x]) else df[x]
+    return df.iloc[lttb(values.to_numpy(), df[y].to_numpy(), max_points)]
+
+
+def visible_range(relayout):
+    """
+    The x-axis range a zoom or pan of a graph settled on, (None, None) once it is reset to the full range,
+    and None when the relayout event did not change the x-axis.
+    """
+    if not relayout:
+        return None
+    if relayout.get("xaxis.autorange"):
+        return None, None
+    if "xaxis.range[0]" in relayout:
+        return relayout["xaxis.range[0]"], relayout["xaxis.range[1]"]
+    if "xaxis.range" in relayout:
+        return tuple(relayout["xaxis.range"])
+    return None
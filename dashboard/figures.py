@@ -0,0 +1,113 @@
+import functools
+import glob
+import hashlib
+import json
+import os
+import threading
+
+# data visualization
+import plotly
+from plotly.io.json import to_json_plotly
+
+import dashboard
+from dashboard.cache import default_cache
+from medium_scraper.metrics import registry
+
+CACHE_REQUESTS = registry.counter("dashboard_figure_cache_requests_total", "Lookups of the figure cache.", ["callback", "result"])
+FIGURE_SECONDS = registry.histogram("dashboard_figure_seconds", "Seconds spent building and serializing figures.", ["callback", "phase"])
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# packages of the code that builds the figures
+CODE_DIRECTORIES = ["dashboard", "pages"]
+
+
+def code_version(root=ROOT, directories=CODE_DIRECTORIES) -> str:
+    """blake2b of the python sources that build the figures and of the plotly version that serializes them."""
+    digest = hashlib.blake2b(plotly.__version__.encode(), digest_size=8)
+    for directory in directories:
+        for path in sorted(glob.glob(os.path.join(root, directory, "*.py"))):
+            digest.update(os.path.relpath(path, root).encode())
+            with open(path, "rb") as f:
+                digest.update(f.read())
+    return digest.hexdigest()
+
+
+class FigureCache:
+    """
+    Cache of the serialized outputs of the figure callbacks, kept in the tiers of a `TieredCache`.
+
+    Entries are keyed by the `code_version` of the figure code, the content fingerprint of the datasets, the callback
+    and its inputs, and hold the output as the JSON the callback would send to the browser, so a hit skips pandas and
+    Plotly entirely. Every worker computes the same keys for the same code and data and shares the entries of the
+    others through the shared tier, while the figures of new code or data are stored under new keys. The in-process
+    tier is dropped when the store reloads the datasets.
+    Without a `store` and a `cache`, the store of the dashboard and the default tiers are set up with the first figure.
+    """
+
+    def __init__(self, store=None, cache=None, version=None):
+        # every cached callback, e.g. to render their initial figures ahead of the first page load
+        self.callbacks = []
+        self.version = version or code_version()
+        self._store = None
+        self._cache = cache
+        self._lock = threading.Lock()
+
+        if store is not None:
+            self._attach(store)
+
+    @property
+    def store(self):
+        if self._store is None:
+            with self._lock:
+                if self._store is None:
+                    self._attach(dashboard.load())
+        return self._store
+
+    @property
+    def cache(self):
+        if self._cache is None:
+            with self._lock:
+                if self._cache is None:
+                    self._cache = default_cache()
+        return self._cache
+
+    def _attach(self, store):
+        self._store = store
+        store.on_reload(lambda _: self.cache.clear(shared=False))
+
+    def get(self, key):
+        return self.cache.get(key)
+
+    def put(self, key, value: str):
+        self.cache.put(key, value)
+
+    def clear(self, shared=True):
+        self.cache.clear(shared)
+
+    def stats(self) -> dict:
+        return self.cache.stats()
+
+    def cached(self, callback):
+        """Decorator caching the output of a callback per code version, dataset fingerprint and inputs."""
+        name = "%s.%s" % (callback.__module__, callback.__qualname__)
+
+        @functools.wraps(callback)
+        def wrapper(*args):
+            self.store.refresh()
+            key = "%s:%s:%s:%s" % (self.version, self.store.version, name, json.dumps(args, sort_keys=True, default=str))
+            output = self.get(key)
+            CACHE_REQUESTS.inc(callback=callback.__name__, result="miss" if output is None else "hit")
+            if output is None:
+                with FIGURE_SECONDS.time(callback=callback.__name__, phase="build"):
+                    figures = callback(*args)
+                with FIGURE_SECONDS.time(callback=callback.__name__, phase="serialize"):
+                    output = to_json_plotly(figures)
+                self.put(key, output)
+            return json.loads(output)
+
+        self.callbacks.append(wrapper)
+        return wrapper
+
+
+figure_cache = FigureCache()
+cached_figure = figure_cache.cached
@@ -0,0 +1,115 @@
+import cProfile
+import functools
+import os
+import random
+import re
+import time
+
+import flask
+
+from medium_scraper.metrics import SIZE_BUCKETS, registry
+
+try:
+    from pyinstrument import Profiler
+except ImportError:
+    Profiler = None
+
+UPDATE_PATH = "_dash-update-component"
+# requests with this header are profiled when a profile directory is set
+PROFILE_HEADER = "X-Profile"
+
+CALLBACK_SECONDS = registry.histogram(
+    "dashboard_callback_seconds", "Seconds spent in every phase of the Dash callback requests.", ["callback", "phase"]
+)
+PAYLOAD_BYTES = registry.histogram("dashboard_callback_payload_bytes", "Bytes of the Dash callback responses.", ["callback"], SIZE_BUCKETS)
+
+
+def timed_callback(name, func):
+    """Time the callback as dash calls it, the serialization of its outputs by dash included."""
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with CALLBACK_SECONDS.time(callback=name, phase="compute"):
+            return func(*args, **kwargs)
+
+    wrapper.instrumented = True
+    return wrapper
+
+
+class Instrumentation:
+    """
+    Times every callback request of a Dash app and serves the metrics of the process on `/metrics`.
+
+    Every request to the callback dispatcher is observed as the `deserialize` phase of its JSON body, the `compute`
+    phase of the callback itself and the `total` time of the request, along with the bytes of the response. The figure
+    callbacks add their cache lookups and figure build times through `dashboard.figures`.
+
+    With a `profile_dir`, the requests sent with the `X-Profile` header and a random `sample_rate` share of all the
+    callback requests are profiled with pyinstrument when it is installed, or cProfile otherwise, into that directory.
+    """
+
+    def __init__(self, app, profile_dir=None, sample_rate=0.0):
+        self.app = app
+        self.profile_dir = profile_dir
+        self.sample_rate = sample_rate
+        self.server = app.server
+
+        self.server.before_request(self.before_request)
+        self.server.after_request(self.after_request)
+        self.server.add_url_rule("/metrics", "metrics", self.metrics)
+
+    def before_request(self):
+        if not flask.request.path.endswith(UPDATE_PATH):
+            return
+        flask.g.callback_start = time.perf_counter()
+        flask.g.callback_name = "unknown"
+
+        start = time.perf_counter()
+        # flask keeps the parsed body, dash reads it again without parsing it twice
+        body = flask.request.get_json(silent=True) or {}
+        callback = self.app.callback_map.get(body.get("output"))
+        if callback is not None and "callback" in callback:
+            flask.g.callback_name = callback["callback"].__name__
+            if not getattr(callback["callback"], "instrumented", False):
+                callback["callback"] = timed_callback(flask.g.callback_name, callback["callback"])
+        CALLBACK_SECONDS.observe(time.perf_counter() - start, callback=flask.g.callback_name, phase="deserialize")
+
+        if self.profile_dir and (PROFILE_HEADER in flask.request.headers or random.random() < self.sample_rate):
+            if Profiler is not None:
+                flask.g.profiler = Profiler()
+                flask.g.profiler.start()
+            else:
+                flask.g.profiler = cProfile.Profile()
+                flask.g.profiler.enable()
+
+    def after_request(self, response):
+        start = flask.g.pop("callback_start", None)
+        if start is None:
+            return response
+        name = flask.g.callback_name
+        profiler = flask.g.pop("profiler", None)
+        if profiler is not None:
+            self.save_profile(profiler, name)
+
+        CALLBACK_SECONDS.observe(time.perf_counter() - start, callback=name, phase="total")
+        PAYLOAD_BYTES.observe(response.content_length or 0, callback=name)
+        return response
+
+    def save_profile(self, profiler, name):
+        os.makedirs(self.profile_dir, exist_ok=True)
+        path = os.path.join(self.profile_dir, "%d-%s" % (time.time_ns(), re.sub(r"\W+", "_", name)))
+        if Profiler is not None:
+            profiler.stop()
+            with open(path + ".html", "w") as f:
+                f.write(profiler.output_html())
+        else:
+            profiler.disable()
+            # readable with pstats or snakeviz
+            profiler.dump_stats(path + ".prof")
+
+    def metrics(self):
+        return flask.Response(registry.expose(), mimetype="text/plain; version=0.0.4")
+
+
+def instrument(app, profile_dir=None, sample_rate=0.0) -> Instrumentation:
+    return Instrumentation(app, profile_dir, sample_rate)
@@ -0,0 +1,30 @@
+import importlib
+
+
+class Lazy:
+    """
+    Stand-in for an object that is only created by `loader` on its first attribute access.
+
+    The pages hold these in place of plotly and the data side of the dashboard, so the app starts serving before
+    pandas, plotly and the datasets are imported.
+    """
+
+    def __init__(self, loader):
+        self._loader = loader
+        self._target = None
+
+    def load(self):
+        if self._target is None:
+            self._target = self._loader()
+        return self._target
+
+    def __getattr__(self, name):
+        return getattr(self.load(), name)
+
+    def __repr__(self):
+        return "<lazy %r>" % (self._target if self._target is not None else self._loader)
+
+
+def lazy_import(name) -> Lazy:
+    """The module, imported on its first attribute access."""
+    return Lazy(lambda: importlib.import_module(name))
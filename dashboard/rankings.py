@@ -0,0 +1,51 @@
+# data processing
+import numpy as np
+import pandas as pd
+
+from dashboard.store import store
+
+# columns shown with two decimals on the Authors page
+COLUMNS_TO_ROUND = ["average_claps", "average_unique_clappers", "average_reading_time", "average_responses"]
+# metrics that have a top-k bar chart on the Authors page
+RANKED_METRICS = [
+    "num_articles",
+    "average_claps",
+    "average_unique_clappers",
+    "average_responses",
+    "average_reading_time",
+    "v3_newsletter_subs",
+    "num_followers",
+]
+TOP_K = 10
+
+
+def top_k(values: np.ndarray, k: int) -> np.ndarray:
+    """Positions of the `k` largest values in descending order, found with a partition instead of a full sort."""
+    values = np.asarray(values, dtype="float64")
+    if len(values) > k:
+        positions = np.argpartition(-values, k - 1)[:k]
+    else:
+        positions = np.arange(len(values))
+    return positions[np.argsort(-values[positions], kind="stable")]
+
+
+class RankingIndex:
+    """
+    Top-k authors of every ranked metric, built once per dataset version.
+    The rows are rounded and sorted at build time, so a chart only slices its metric's table.
+    """
+
+    def __init__(self, authors: pd.DataFrame, metrics=RANKED_METRICS, k=TOP_K):
+        authors = authors.copy(deep=False)
+        authors[COLUMNS_TO_ROUND] = authors[COLUMNS_TO_ROUND].round(2)
+
+        self.k = k
+        self.tables = {metric: authors.iloc[top_k(authors[metric].to_numpy(), k)].reset_index(drop=True) for metric in metrics}
+
+    def top(self, metric, n=TOP_K) -> pd.DataFrame:
+        if n > self.k:
+            raise ValueError("The index only keeps the top %d rows of every metric." % (self.k))
+        return self.tables[metric].head(n)
+
+
+store.register("author_rankings", RankingIndex, source="authors")
@@ -0,0 +1,154 @@
+import re
+from bisect import bisect_left
+
+# data processing
+import numpy as np
+import pandas as pd
+
+from dashboard.columns import PAGE_SIZE, TABLE_COLUMNS
+from dashboard.rankings import COLUMNS_TO_ROUND
+from dashboard.store import store
+
+# operators of the DataTable filter expressions, by every spelling the filter query may use
+FILTER_OPERATORS = {
+    ">=": "ge",
+    "<=": "le",
+    "<": "lt",
+    ">": "gt",
+    "!=": "ne",
+    "=": "eq",
+    "contains": "contains",
+    "datestartswith": "datestartswith",
+}
+FILTER_OPERATORS.update({operator: operator for operator in list(FILTER_OPERATORS.values())})
+FILTER_PART = re.compile(r"\{(?P<column>[^}]+)\}\s+(?P<operator>\S+)\s+(?P<value>.+)")
+
+
+def normalize(text: str) -> str:
+    return " ".join(text.casefold().split())
+
+
+def parse_filter(filter_query: str) -> list[tuple]:
+    """
+    Split a DataTable filter query like `{num_articles} s> 100 && {author} icontains tim` into
+    (column, operator, value, case_sensitive) parts, the `i`/`s` prefixes of the operators select the case sensitivity.
+    """
+    parts = []
+    for part in filter_query.split(" && ") if filter_query else []:
+        match = FILTER_PART.fullmatch(part.strip())
+        if match is None:
+            continue
+        column, operator, value = match.group("column", "operator", "value")
+        case_sensitive = not operator.startswith("i")
+        if operator not in FILTER_OPERATORS and operator[:1] in ("i", "s"):
+            operator = operator[1:]
+        if operator not in FILTER_OPERATORS:
+            continue
+        operator = FILTER_OPERATORS[operator]
+
+        if len(value) > 1 and value[0] == value[-1] and value[0] in "'\"`":
+            value = value[1:-1].replace("\\" + value[0], value[0])
+        elif operator not in ("contains", "datestartswith"):
+            try:
+                value = float(value)
+            except ValueError:
+                pass
+        parts.append((column, operator, value, case_sensitive))
+    return parts
+
+
+class AuthorIndex:
+    """
+    Case-insensitive prefix index over the author names.
+
+    Every name is stored under its full name and under every trailing run of its words ("aboul hasan", "hasan"),
+    so a query matches both the start of a name and the start of any word in it. The keys are kept in a sorted
+    list and a prefix lookup is two binary searches.
+
+    The table is sorted by every column once at build time, so a page of the DataTable in any sort order is a slice
+    of a precomputed order when there is no query or filter, and a partial sort of the matches up to the page otherwise.
+    """
+
+    def __init__(self, authors: pd.DataFrame):
+        keys = []
+        positions = []
+        for position, name in enumerate(authors["author"].astype(str)):
+            tokens = normalize(name).split()
+            for i in range(len(tokens)):
+                keys.append(" ".join(tokens[i:]))
+                positions.append(position)
+
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        self.keys = [keys[i] for i in order]
+        self.positions = np.array([positions[i] for i in order], dtype="int64")
+
+        self.table = authors[TABLE_COLUMNS].copy()
+        self.table[COLUMNS_TO_ROUND] = self.table[COLUMNS_TO_ROUND].round(2)
+
+        # order of the rows by every column in both directions, with the missing values last, and the rank of every
+        # row in that order
+        self.orders = {}
+        for column in TABLE_COLUMNS:
+            values = self.table[column].reset_index(drop=True)
+            for descending in (False, True):
+                order = values.sort_values(ascending=not descending, kind="stable", na_position="last")
+                self.orders[column, descending] = order.index.to_numpy()
+        self.ranks = {key: np.argsort(order, kind="stable") for key, order in self.orders.items()}
+
+    def matches(self, query: str) -> np.ndarray:
+        """Row positions of all the authors matching the query, in the order of the author table."""
+        prefix = normalize(query)
+        lo = bisect_left(self.keys, prefix)
+        hi = bisect_left(self.keys, prefix + "\uffff", lo)
+        return np.unique(self.positions[lo:hi])
+
+    def filter(self, filter_query: str) -> np.ndarray:
+        """Row positions of the authors matching a DataTable filter query."""
+        mask = np.ones(len(self.table), dtype=bool)
+        for column, operator, value, case_sensitive in parse_filter(filter_query):
+            if column not in self.table:
+                continue
+            values = self.table[column]
+            if operator == "contains":
+                mask &= values.astype(str).str.contains(str(value), case=case_sensitive, regex=False).to_numpy()
+            elif operator == "datestartswith":
+                mask &= values.astype(str).str.startswith(str(value)).to_numpy()
+            else:
+                if not pd.api.types.is_numeric_dtype(values) or isinstance(value, str):
+                    values, value = values.astype(str), str(value)
+                    if not case_sensitive:
+                        values, value = values.str.casefold(), value.casefold()
+                mask &= getattr(values, operator)(value).to_numpy()
+        return np.flatnonzero(mask)
+
+    def page(self, query="", page_current=0, page_size=PAGE_SIZE, sort_by=None, filter_query="") -> tuple[pd.DataFrame, int]:
+        """
+        Rows of a single page of the authors matching the search query and the filter, in the DataTable sort order,
+        and the number of pages.
+        """
+        positions = None
+        if normalize(query):
+            positions = self.matches(query)
+        if filter_query:
+            filtered = self.filter(filter_query)
+            positions = filtered if positions is None else np.intersect1d(positions, filtered, assume_unique=True)
+
+        total = len(self.table) if positions is None else len(positions)
+        start = page_current * page_size
+        end = min(start + page_size, total)
+        if sort_by:
+            column, descending = sort_by[0]["column_id"], sort_by[0]["direction"] == "desc"
+            if positions is None:
+                positions = self.orders[column, descending]
+            elif end > 0:
+                # the ranks are unique, so partitioning out the rows up to the page end and sorting only those is exact
+                ranks = self.ranks[column, descending][positions]
+                head = np.argpartition(ranks, end - 1)[:end] if end < total else np.arange(total)
+                positions = positions[head[np.argsort(ranks[head])]]
+
+        page = slice(start, start + page_size)
+        rows = self.table.iloc[page] if positions is None else self.table.iloc[positions[page]]
+        return rows, max(1, -(-total // page_size))
+
+
+store.register("author_index", AuthorIndex, source="authors")
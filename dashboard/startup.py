@@ -0,0 +1,68 @@
+import importlib
+import socket
+import sys
+import threading
+import time
+
+import dashboard
+from dashboard.figures import figure_cache
+
+# imported by the first callbacks, so they are imported ahead of the first page load
+HEAVY_MODULES = ["numpy", "pandas", "plotly.express", "plotly.graph_objects", "plotly.subplots", "dashboard.downsample"]
+
+
+def warm_up():
+    """Import the heavy modules, load the datasets with their derived tables and render the initial figures."""
+    start = time.perf_counter()
+    for name in HEAVY_MODULES:
+        importlib.import_module(name)
+    dashboard.load().preload()
+    # the inputs of the figure callbacks are all empty on the first load of a page
+    for callback in figure_cache.callbacks:
+        callback(None)
+    print("Warmed up the dashboard in %.2fs" % (time.perf_counter() - start))
+
+
+def wait_until_listening(host, port, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection((host, port), timeout=0.1):
+                return True
+        except OSError:
+            time.sleep(0.05)
+    return False
+
+
+def wait_for_imports():
+    """
+    Block until the heavy modules the warm-up is importing are fully initialized. Plotly and dash look pandas up in
+    `sys.modules` without importing it, so they could otherwise see a half-imported module.
+    """
+    for name in HEAVY_MODULES:
+        if name in sys.modules:
+            # waits on the import lock of a module that another thread is still importing
+            importlib.import_module(name)
+
+
+def warm_up_in_background(server, host="127.0.0.1", port=8050, idle=1.0) -> threading.Thread:
+    """
+    Warm up the dashboard in a daemon thread once the server accepts connections on the port and served its first
+    response, or was idle for `idle` seconds, so the first page does not compete with the imports.
+    """
+    served = threading.Event()
+    server.before_request(wait_for_imports)
+
+    @server.after_request
+    def first_response(response):
+        served.set()
+        return response
+
+    def run():
+        if wait_until_listening(host, port):
+            served.wait(idle)
+            warm_up()
+
+    thread = threading.Thread(target=run, name="warm-up", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,174 @@
+import hashlib
+import os
+import threading
+import time
+
+import dotenv
+
+# data processing
+import pandas as pd
+
+from medium_scraper.database import DATABASE_FILENAME, Database
+from medium_scraper.schema import DASHBOARD_DATASETS, read_columnar, read_source
+
+dotenv.load_dotenv(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".env"))
+DATASET_DIR = os.getenv("DATASET_PATH", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "datasets"))
+
+
+class DatasetStore:
+    """
+    Process-wide, read-only holder of the dashboard datasets.
+
+    Every dataset is loaded once into a typed dataframe and shared between the callbacks of all the pages.
+    The typed Feather copy written by the pipeline is memory-mapped when it is up to date, the CSV is parsed otherwise.
+    The files are re-checked at most every `check_interval` seconds and reloaded when they change on disk.
+    `version` is a fingerprint of the content of the datasets, the same in every process reading the same files.
+    The frames returned by `frame` share their memory with the store, so they must not be modified in place.
+    Filtered reads go through `database`, the SQLite store written by the pipeline, or an in-memory copy of the
+    publication articles when that file is missing or older than them.
+    """
+
+    def __init__(self, dataset_dir=DATASET_DIR, datasets=DASHBOARD_DATASETS, check_interval=5.0):
+        self.dataset_dir = dataset_dir
+        self.datasets = datasets
+        self.check_interval = check_interval
+
+        self.version = None
+        self._frames = {}
+        self._stats = {}
+        self._derived = {}
+        self._database = None
+        self._builders = {}
+        self._listeners = []
+        self._last_check = 0.0
+        self._lock = threading.RLock()
+
+    def path(self, name):
+        return os.path.join(self.dataset_dir, self.datasets[name]["filename"])
+
+    def columnar_path(self, name):
+        return os.path.join(self.dataset_dir, self.datasets[name]["columnar"])
+
+    def frame(self, name) -> pd.DataFrame:
+        self.refresh()
+        with self._lock:
+            if name not in self._frames:
+                self._frames[name] = self._load(name)
+            # shallow copy: new columns stay local to the caller, the column data is shared
+            return self._frames[name].copy(deep=False)
+
+    def database_path(self):
+        return os.path.join(self.dataset_dir, DATABASE_FILENAME)
+
+    def database(self) -> Database:
+        self.refresh()
+        with self._lock:
+            if self._database is None:
+                self._database = self._open_database()
+            return self._database
+
+    def register(self, name, builder, source):
+        """Register a table that is derived from the `source` dataset and rebuilt once per dataset version."""
+        with self._lock:
+            self._builders[name] = (builder, source)
+            self._derived.pop(name, None)
+
+    def derived(self, name):
+        self.refresh()
+        with self._lock:
+            if name not in self._derived:
+                builder, source = self._builders[name]
+                self._derived[name] = builder(self.frame(source))
+            return self._derived[name]
+
+    def preload(self):
+        """Load the derived tables with the datasets they are built from and the database ahead of the callbacks."""
+        for name in list(self._builders):
+            self.derived(name)
+        self.database()
+
+    def close_database(self):
+        """
+        Close the database, which is opened again by the next read. A process that forks workers closes it before, as
+        SQLite connections must not be carried across `fork()`, and every worker opens or rebuilds its own.
+        """
+        with self._lock:
+            if self._database is not None:
+                self._database.close()
+                self._database = None
+
+    def on_reload(self, callback):
+        """Call `callback(store)` every time the datasets change on disk."""
+        self._listeners.append(callback)
+        return callback
+
+    def refresh(self, force=False):
+        """Reload the datasets if their files changed on disk, `force` reloads them unconditionally."""
+        now = time.monotonic()
+        if not force and self.version is not None and now - self._last_check < self.check_interval:
+            return False
+        with self._lock:
+            self._last_check = now
+            stats = {name: self._stat(name) for name in self.datasets}
+            stats["database"] = (self._stat_file(self.database_path()),)
+            if not force and stats == self._stats:
+                return False
+            previous = self.version
+            self._stats = stats
+            self.version = self._fingerprint()
+            self._frames.clear()
+            self._derived.clear()
+            # the previous database is closed when the callbacks still using it drop their reference
+            self._database = None
+        # a file rewritten with the same content keeps the version and whatever was computed from it
+        if previous is not None and self.version != previous:
+            for callback in self._listeners:
+                callback(self)
+        return True
+
+    def reload(self):
+        return self.refresh(force=True)
+
+    def _stat(self, name):
+        return self._stat_file(self.path(name)), self._stat_file(self.columnar_path(name))
+
+    def _stat_file(self, path):
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _fingerprint(self, chunk_size=1 << 20):
+        """blake2b of the content of the dataset files, the copies written by the pipeline follow from the sources."""
+        digest = hashlib.blake2b(digest_size=8)
+        for name in sorted(self.datasets):
+            source, _ = self._stats[name]
+            path = self.path(name) if source is not None else self.columnar_path(name)
+            digest.update(name.encode())
+            try:
+                with open(path, "rb") as f:
+                    for chunk in iter(lambda: f.read(chunk_size), b""):
+                        digest.update(chunk)
+            except FileNotFoundError:
+                digest.update(b"\0")
+        return digest.hexdigest()
+
+    def _load(self, name):
+        source, columnar = self._stats.get(name) or self._stat(name)
+        if columnar is not None and (source is None or columnar[0] >= source[0]):
+            return read_columnar(self.columnar_path(name))
+        return read_source(self.path(name), name)
+
+    def _open_database(self):
+        (database,) = self._stats["database"]
+        sources = [self._stats["processed"][0]] if "processed" in self._stats else []
+        if database is not None and all(source is None or database[0] >= source[0] for source in sources):
+            return Database(self.database_path(), readonly=True)
+        database = Database()
+        if "processed" in self.datasets:
+            database.insert_articles(self.frame("processed"))
+        return database
+
+
+store = DatasetStore()
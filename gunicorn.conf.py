@@ -0,0 +1,37 @@
+"""
+Production server of the dashboard, started from the root of the repository with
+
+    gunicorn app:server
+
+The app is imported, the datasets loaded and the initial figures rendered once in the master process before the
+workers are forked, so every worker starts warm and shares the memory of the datasets copy-on-write. The debug
+server of `python app.py` is for development only.
+"""
+import gc
+import multiprocessing
+import os
+
+bind = "%s:%s" % (os.getenv("HOST", "0.0.0.0"), os.getenv("PORT", "8050"))
+# a worker per core, every extra worker only adds the memory it writes to
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+threads = int(os.getenv("THREADS", "1"))
+timeout = int(os.getenv("TIMEOUT", "60"))
+preload_app = True
+
+
+def when_ready(server):
+    # runs in the master after the app is loaded and before any worker is forked
+    import dashboard
+    from dashboard.startup import warm_up
+
+    warm_up()
+    dashboard.dataset_store.close_database()
+    # the collector of the workers never traverses the objects loaded so far, which would write to their pages
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    import dashboard
+
+    # every worker opens the database file, or rebuilds the in-memory copy, before it accepts requests
+    dashboard.dataset_store.database()
@@ -0,0 +1,10 @@
+__all__ = ["ProfileScraper"]
+
+
+def __getattr__(name):
+    # aiohttp is only imported by the scrapers, not by the dashboard reading the metrics and datasets of the package
+    if name == "ProfileScraper":
+        from medium_scraper.profile import ProfileScraper
+
+        return ProfileScraper
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
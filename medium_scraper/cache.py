@@ -0,0 +1,104 @@
+import hashlib
+import os
+import pickle
+import time
+
+import requests
+import requests.adapters
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from medium_scraper.filestore import FileStore
+
+
+class CacheMiss(LookupError):
+    """Raised in offline mode when a request is not in the cache."""
+
+
+class ResponseCache(FileStore):
+    """
+    Content-addressed on-disk cache of HTTP responses.
+
+    Every response is pickled under the sha256 of its method, url and request body. Entries older than `ttl` seconds
+    are refetched, and once the cache grows over `max_bytes` the least recently used entries are deleted.
+    In `offline` mode the entries never expire and a miss raises `CacheMiss` instead of going to the network.
+    """
+
+    def __init__(self, directory, ttl=24 * 60 * 60, max_bytes=512 * 1024 * 1024, offline=False):
+        super().__init__(directory, max_bytes)
+        self.ttl = ttl
+        self.offline = offline
+
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(method, url, body=None) -> str:
+        if isinstance(body, str):
+            body = body.encode()
+        body_hash = hashlib.sha256(body or b"").hexdigest()
+        return hashlib.sha256(f"{method.upper()} {url} {body_hash}".encode()).hexdigest()
+
+    def get(self, key):
+        content = self.read(key)
+        try:
+            entry = pickle.loads(content) if content is not None else None
+        except (EOFError, pickle.UnpicklingError):
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+
+        if not self.offline and self.ttl is not None and time.time() - entry["created"] > self.ttl:
+            self.misses += 1
+            return None
+
+        self.touch(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key, response: requests.Response):
+        entry = {
+            "created": time.time(),
+            "url": response.url,
+            "status_code": response.status_code,
+            "reason": response.reason,
+            "headers": dict(response.headers),
+            "content": response.content,
+        }
+        self.write(key, pickle.dumps(entry))
+
+
+class CachingAdapter(requests.adapters.HTTPAdapter):
+    """Transport adapter that answers the requests of a session from a `ResponseCache` and caches its successful responses."""
+
+    def __init__(self, cache: ResponseCache, **kwargs):
+        super().__init__(**kwargs)
+        self.cache = cache
+
+    def send(self, request, **kwargs):
+        key = self.cache.key(request.method, request.url, request.body)
+        entry = self.cache.get(key)
+        if entry is not None:
+            return self.build_cached_response(request, entry)
+        if self.cache.offline:
+            raise CacheMiss("%s %s is not in the response cache" % (request.method, request.url))
+
+        response = super().send(request, **kwargs)
+        if response.status_code == 200:
+            self.cache.put(key, response)
+        return response
+
+    def build_cached_response(self, request, entry) -> requests.Response:
+        response = requests.Response()
+        response.status_code = entry["status_code"]
+        response.reason = entry["reason"]
+        response.headers = CaseInsensitiveDict(entry["headers"])
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.url = entry["url"]
+        response._content = entry["content"]
+        response.request = request
+        response.connection = self
+        return response
@@ -0,0 +1,112 @@
+import os
+import sqlite3
+import threading
+
+# data processing
+import pandas as pd
+
+# file name of the analytical store the pipeline writes next to the datasets
+DATABASE_FILENAME = "medium.db"
+# dates are stored as ISO strings, so they sort and compare lexicographically
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+ARTICLE_COLUMNS = ["publication_url", "author", "date", "reading_time", "title", "claps"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    publication_url TEXT NOT NULL,
+    author TEXT,
+    date TEXT,
+    reading_time INTEGER,
+    title TEXT,
+    claps REAL
+);
+CREATE INDEX IF NOT EXISTS articles_publication_date ON articles (publication_url, date);
+CREATE INDEX IF NOT EXISTS articles_date ON articles (date);
+"""
+
+
+def to_records(frame: pd.DataFrame, columns):
+    """Rows of the frame as tuples of python values, with the dates formatted and the missing values as NULL."""
+    frame = frame[columns].copy()
+    for column in frame.columns:
+        if pd.api.types.is_datetime64_any_dtype(frame[column]):
+            frame[column] = frame[column].dt.strftime(DATE_FORMAT)
+    frame = frame.astype(object).where(frame.notna(), None)
+    return frame.itertuples(index=False, name=None)
+
+
+class Database:
+    """
+    Indexed SQLite store of the publication articles.
+
+    The pipeline fills it with bulk `executemany` inserts, and the dashboard reads filtered and aggregated rows from it
+    through the query methods, so a drill-down only reads the rows of the selected publication.
+    A single connection is shared between the threads and the statements are serialized by a lock.
+    """
+
+    def __init__(self, path=":memory:", readonly=False):
+        self.path = path
+        self.readonly = readonly
+        self._lock = threading.Lock()
+
+        if readonly:
+            self.connection = sqlite3.connect("file:%s?mode=ro" % path, uri=True, check_same_thread=False)
+        else:
+            self.connection = sqlite3.connect(path, check_same_thread=False)
+            self.connection.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def insert_articles(self, frame: pd.DataFrame, replace=False):
+        """Insert the rows of the processed publications dataset, `replace` drops the existing articles first."""
+        statement = "INSERT INTO articles (%s) VALUES (%s)" % (", ".join(ARTICLE_COLUMNS), ", ".join("?" * len(ARTICLE_COLUMNS)))
+        with self._lock, self.connection:
+            if replace:
+                self.connection.execute("DELETE FROM articles")
+            self.connection.executemany(statement, to_records(frame, ARTICLE_COLUMNS))
+
+    def query(self, sql, params=(), parse_dates=None) -> pd.DataFrame:
+        with self._lock:
+            return pd.read_sql_query(sql, self.connection, params=params, parse_dates=parse_dates)
+
+    def scalar(self, sql, params=()):
+        with self._lock:
+            return self.connection.execute(sql, params).fetchone()[0]
+
+    def publication_articles(self, publication, columns=("date", "claps", "reading_time"), start=None, end=None) -> pd.DataFrame:
+        """
+        Articles of a single publication in date order, read through the (publication_url, date) index.
+        `start` and `end` optionally bound the dates, as dates or ISO date strings.
+        """
+        sql = "SELECT %s FROM articles WHERE publication_url = ?" % ", ".join(columns)
+        params = [publication]
+        if start is not None:
+            sql += " AND date >= ?"
+            params.append(str(start))
+        if end is not None:
+            sql += " AND date <= ?"
+            params.append(str(end))
+        return self.query(sql + " ORDER BY date", params, parse_dates=[c for c in columns if c == "date"])
+
+
+def build_database(path, articles):
+    """
+    Write a new database file from the articles frame, then replace `path` with it.
+    Readers that opened the previous file keep reading it until they reopen.
+    """
+    if os.path.exists(path + ".tmp"):
+        os.remove(path + ".tmp")
+    with Database(path + ".tmp") as database:
+        database.insert_articles(articles)
+        num_articles = database.scalar("SELECT COUNT(*) FROM articles")
+    os.replace(path + ".tmp", path)
+    return num_articles
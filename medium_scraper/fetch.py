@@ -0,0 +1,164 @@
+import email.utils
+import logging
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+import requests
+import requests.adapters
+
+from medium_scraper.cache import CachingAdapter
+from medium_scraper.metrics import stage, timed_request
+
+
+class RateLimiter:
+    """Spaces out the requests sent to the same host by at least `1 / rate` seconds, shared by all threads."""
+
+    def __init__(self, rate=None):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next_slot = {}
+        self._lock = threading.Lock()
+
+    def reserve(self, url) -> float:
+        """Take the next slot of the host of the url and return the seconds to wait until it."""
+        if not self.interval:
+            return 0.0
+        host = urlsplit(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.interval
+        return slot - now
+
+    def wait(self, url):
+        delay = self.reserve(url)
+        if delay > 0:
+            time.sleep(delay)
+
+
+# errors of requests without a response that may succeed when the request is sent again
+TRANSIENT_ERRORS = (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError)
+
+
+def retryable(status) -> bool:
+    """Whether a response with this status is worth retrying, the other client errors would fail again."""
+    return status == 429 or status >= 500
+
+
+def parse_retry_after(value):
+    """Seconds to wait from a `Retry-After` header, given in seconds or as an HTTP date, or None without one."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        date = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return max((date - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+def backoff_delay(attempt, backoff=1.0, retry_after=None) -> float:
+    """Jittered exponential backoff of the attempt, at least the `Retry-After` of the failed response when it has one."""
+    delay = backoff * 2**attempt * random.uniform(0.5, 1.0)
+    wait = parse_retry_after(retry_after)
+    return max(delay, wait) if wait is not None else delay
+
+
+def retry(func, *args, retries=3, backoff=1.0, **kwargs):
+    """
+    Call `func`, retrying it up to `retries` times with a jittered exponential backoff when it raises a connection
+    error, a timeout or the `HTTPError` of a 429 or 5xx response. The `Retry-After` of the response is honored.
+    """
+    for attempt in range(retries + 1):
+        try:
+            return func(*args, **kwargs)
+        except requests.RequestException as e:
+            response = e.response
+            if isinstance(e, requests.HTTPError) and response is not None:
+                transient, retry_after = retryable(response.status_code), response.headers.get("Retry-After")
+            else:
+                transient, retry_after = isinstance(e, TRANSIENT_ERRORS), None
+            if attempt == retries or not transient:
+                raise
+            delay = backoff_delay(attempt, backoff, retry_after)
+            logging.warning(f"Attempt {attempt + 1} failed ({e}), retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+
+class FetchEngine:
+    """
+    Fetches urls concurrently over a pooled keep-alive `requests.Session`.
+    One engine is meant to be shared by every scraper of a run, so all of them reuse the same connections.
+    With a `ResponseCache` every request of the session, including POSTs, goes through the on-disk cache.
+    """
+
+    def __init__(self, workers=16, rate=None, retries=3, session=None, cache=None):
+        self.session = session or requests.Session()
+        if cache is not None:
+            # the responses are served from and saved to the on-disk cache below the session
+            adapter = CachingAdapter(cache, pool_connections=workers, pool_maxsize=workers)
+        else:
+            adapter = requests.adapters.HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self.limiter = RateLimiter(rate)
+        self.retries = retries
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+
+    def get(self, url, state=None, **kwargs) -> requests.Response:
+        """
+        GET the url with retries, a 429 or 5xx response that is still failing after them raises an `HTTPError`, the
+        other responses are returned. With a `CrawlState` the request is conditional on the validators of the previous
+        response, a 304 response means the page did not change since then.
+        """
+        if state is not None:
+            kwargs["headers"] = {**state.headers(url), **kwargs.get("headers", {})}
+
+        def send():
+            response = self.request("GET", url, **kwargs)
+            if retryable(response.status_code):
+                response.raise_for_status()
+            return response
+
+        with stage("fetch"):
+            self.limiter.wait(url)
+            logging.info(f"Sending the GET request: {url}")
+            response = retry(send, retries=self.retries)
+
+        if state is not None and response.status_code == 200:
+            state.update(url, etag=response.headers.get("ETag"), last_modified=response.headers.get("Last-Modified"))
+        return response
+
+    def request(self, method, url, **kwargs) -> requests.Response:
+        """A single attempt of the request over the pooled session, timed into the HTTP request metrics."""
+        with timed_request(method, url) as timing:
+            response = self.session.request(method, url, **kwargs)
+            timing["status"] = response.status_code
+        return response
+
+    def submit(self, url, **kwargs) -> Future:
+        return self.executor.submit(self.get, url, **kwargs)
+
+    def map(self, urls, **kwargs) -> list[requests.Response]:
+        """Fetch all the urls concurrently, the responses are returned in the order of the urls."""
+        futures = [self.submit(url, **kwargs) for url in urls]
+        return [future.result() for future in futures]
+
+    def close(self):
+        self.executor.shutdown()
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,96 @@
+import logging
+import os
+import tempfile
+import threading
+
+
+class FileStore:
+    """
+    Directory of files named by their keys, in subdirectories of the first two characters of the key, which can be
+    shared by the threads and processes of a host.
+
+    Every file is written to a unique temporary file first and then atomically moved into place, the modification
+    time of a file is its recency, and once the directory grows over `max_bytes` the least recently used files are
+    deleted until it is back under 90% of `max_bytes`. Files removed by another thread or process are skipped.
+    """
+
+    def __init__(self, directory, max_bytes=512 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        # counted on the first write, the directory may hold the files of earlier runs
+        self.size = None
+        self._lock = threading.Lock()
+
+    def path(self, key):
+        return os.path.join(self.directory, key[:2], key)
+
+    def read(self, key):
+        """The content of the file of the key, or None when there is none."""
+        try:
+            with open(self.path(key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def touch(self, key):
+        try:
+            os.utime(self.path(key))
+        except FileNotFoundError:
+            pass
+
+    def write(self, key, content: bytes) -> int:
+        """Write the content under the key and return the number of files evicted to make room for it."""
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, partial_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+        os.replace(partial_path, path)
+
+        with self._lock:
+            if self.size is None:
+                self.size = sum(os.path.getsize(path) for path in self._files())
+            else:
+                self.size += len(content)
+            if self.size > self.max_bytes:
+                return self.evict()
+        return 0
+
+    def evict(self) -> int:
+        """Delete the least recently used files until the directory is back under 90% of `max_bytes`."""
+        files = []
+        for path in self._files():
+            try:
+                files.append((os.stat(path), path))
+            except FileNotFoundError:
+                continue
+        files.sort(key=lambda file: file[0].st_mtime)
+        self.size = sum(st.st_size for st, _ in files)
+        evicted = 0
+        for st, path in files:
+            if self.size <= self.max_bytes * 0.9:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                # already evicted by another thread or process
+                pass
+            self.size -= st.st_size
+            evicted += 1
+            logging.info(f"Evicted {path}")
+        return evicted
+
+    def clear(self):
+        with self._lock:
+            for path in self._files():
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            self.size = 0
+
+    def _files(self):
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if not name.endswith(".tmp"):
+                    yield os.path.join(root, name)
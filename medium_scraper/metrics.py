@@ -0,0 +1,152 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+# upper bounds of the latency buckets, in seconds
+TIME_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# upper bounds of the size buckets, in bytes
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+
+def format_labels(names, values) -> str:
+    if not names:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for value in values)
+    return "{%s}" % ",".join('%s="%s"' % (name, value) for name, value in zip(names, escaped))
+
+
+def format_value(value) -> str:
+    return "+Inf" if value == float("inf") else repr(float(value))
+
+
+class Counter:
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels[name]) for name in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(tuple(str(labels[name]) for name in self.labels), 0)
+
+    def expose(self) -> list[str]:
+        lines = ["# HELP %s %s" % (self.name, self.documentation), "# TYPE %s counter" % self.name]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append("%s%s %s" % (self.name, format_labels(self.labels, key), format_value(value)))
+        return lines
+
+
+class Histogram:
+    """Cumulative bucket counts, sum and count of the observed values, per combination of the label values."""
+
+    def __init__(self, name, documentation, labels=(), buckets=TIME_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels[name]) for name in self.labels)
+        with self._lock:
+            counts, total = self._values.get(key) or ([0] * len(self.buckets), 0.0)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            self._values[key] = (counts, total + value)
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the seconds spent in the block, also when it raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels):
+        counts, _ = self._values.get(tuple(str(labels[name]) for name in self.labels)) or ([0], 0.0)
+        return sum(counts)
+
+    def expose(self) -> list[str]:
+        lines = ["# HELP %s %s" % (self.name, self.documentation), "# TYPE %s histogram" % self.name]
+        with self._lock:
+            for key, (counts, total) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, counts):
+                    cumulative += count
+                    labels = format_labels(self.labels + ("le",), key + (format_value(bound),))
+                    lines.append("%s_bucket%s %d" % (self.name, labels, cumulative))
+                lines.append("%s_sum%s %s" % (self.name, format_labels(self.labels, key), format_value(total)))
+                lines.append("%s_count%s %d" % (self.name, format_labels(self.labels, key), cumulative))
+        return lines
+
+
+class Registry:
+    """
+    Process-wide collection of the metrics, exposed in the Prometheus text format.
+    Asking twice for a metric of the same name returns the same metric, so modules can declare theirs independently.
+    """
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name, documentation, labels=()) -> Counter:
+        return self._get(Counter, name, documentation, labels)
+
+    def histogram(self, name, documentation, labels=(), buckets=TIME_BUCKETS) -> Histogram:
+        return self._get(Histogram, name, documentation, labels, buckets)
+
+    def _get(self, cls, name, *args):
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = cls(name, *args)
+            return self._metrics[name]
+
+    def expose(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(line for metric in metrics for line in metric.expose()) + "\n"
+
+    def write(self, path):
+        """Write the metrics in the text format, e.g. for the textfile collector of the node exporter."""
+        with open(path + ".tmp", "w") as f:
+            f.write(self.expose())
+        # atomic, a collector never reads a half-written file
+        os.replace(path + ".tmp", path)
+
+
+registry = Registry()
+
+STAGE_SECONDS = registry.histogram("medium_scraper_stage_seconds", "Seconds spent in every stage of the scrapers.", ["stage"])
+HTTP_SECONDS = registry.histogram(
+    "medium_scraper_http_request_seconds", "Seconds of every HTTP request attempt of the scrapers.", ["method", "host", "status"]
+)
+
+
+@contextmanager
+def timed_request(method, url):
+    """Time the HTTP request of the block, the block sets `status` on the yielded dict; a raised error counts as "error"."""
+    start = time.perf_counter()
+    request = {"status": "error"}
+    try:
+        yield request
+    finally:
+        HTTP_SECONDS.observe(time.perf_counter() - start, method=method, host=urlsplit(url).netloc, status=request["status"])
+
+
+def stage(name):
+    """Time the block as a stage of the scrapers."""
+    return STAGE_SECONDS.time(stage=name)
@@ -0,0 +1,58 @@
+import re
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import lxml.html
+
+    BACKEND = "lxml"
+except ImportError:
+    BACKEND = "html.parser"
+
+# only the post previews of an archive page are turned into a tree, the rest of the page is skipped by the parser
+# (the strainer sees the raw class attribute, so the class is matched as a word of it)
+POST_PREVIEWS = SoupStrainer("div", class_=re.compile(r"(^|\s)streamItem--postPreview(\s|$)"))
+
+
+def parse_posts(content, parser="html.parser", strained=True) -> list:
+    """
+    Parse the post previews of an archive page into BeautifulSoup tags with the given tree builder.
+    `strained=False` builds the tree of the whole page, as the scraper used to.
+    """
+    page = BeautifulSoup(content, parser, parse_only=POST_PREVIEWS if strained else None)
+    return page.find_all("div", class_="streamItem--postPreview")
+
+
+def _has_class(name):
+    return 'contains(concat(" ", normalize-space(@class), " "), " %s ")' % name
+
+
+POST_XPATH = "//div[%s]" % _has_class("streamItem--postPreview")
+AUTHOR_XPATH = ".//div[%s]//a" % _has_class("postMetaInline-authorLockup")
+CAPTION_XPATH = ".//div[%s]" % _has_class("ui-caption")
+READING_TIME_XPATH = ".//span[%s]/@title" % _has_class("readingTime")
+CONTENT_XPATH = ".//div[%s]" % _has_class("postArticle-content")
+CLAPS_XPATH = ".//div[%s]//span" % _has_class("multirecommend")
+
+
+def extract_posts(content) -> list[dict]:
+    """
+    Extract the raw fields of every post preview with lxml's own tree and XPath, the same fields
+    `PublicationScraper.get_data` finds with BeautifulSoup at a fraction of the cost.
+    """
+    samples = []
+    for post in lxml.html.fromstring(content).xpath(POST_XPATH):
+        uicaption = post.xpath(CAPTION_XPATH)[0]
+        article_content = post.xpath(CONTENT_XPATH)[0]
+        samples.append(
+            {
+                "author": post.xpath(AUTHOR_XPATH)[0].text_content(),
+                "date": uicaption.xpath(".//a//time/@datetime")[0],
+                "reading_time": uicaption.xpath(READING_TIME_XPATH)[0],
+                "post_url": article_content.getparent().get("href"),
+                "title": article_content.xpath(".//h3")[0].text_content(),
+                "preview_image_url": article_content.xpath(".//figure//img/@src")[0],
+                "claps": post.xpath(CLAPS_XPATH)[-1].text_content(),
+            }
+        )
+    return samples
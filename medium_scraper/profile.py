@@ -0,0 +1,275 @@
+import asyncio
+import logging
+import os
+import pickle
+import threading
+from datetime import datetime, timedelta
+from urllib.parse import urlsplit
+
+import aiohttp
+import orjson
+
+from medium_scraper.fetch import RateLimiter, backoff_delay, retry, retryable
+from medium_scraper.metrics import stage, timed_request
+
+GRAPHQL_URL = "https://medium.com/_/graphql"
+# the UserProfileQuery operation recorded from the profile pages of medium.com
+PAYLOAD_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "payload")
+IMAGE_URL = "https://miro.medium.com/%s"
+HEADERS = {"Content-Type": "application/json", "Accept": "application/json"}
+# errors of requests without a response that may succeed when the request is sent again
+TRANSIENT_ERRORS = (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError)
+
+
+class GraphQLError(RuntimeError):
+    pass
+
+
+def load_operation(path=PAYLOAD_PATH) -> dict:
+    with open(path, "rb") as f:
+        operations = pickle.load(f)
+    return next(operation for operation in operations if operation["operationName"] == "UserProfileQuery")
+
+
+def username(url) -> str:
+    """Medium username of a profile url, either `https://<username>.medium.com/` or `https://medium.com/@<username>`."""
+    parts = urlsplit(url if "//" in url else "https://" + url)
+    path = parts.path.strip("/")
+    if path.startswith("@"):
+        return path[1:].split("/")[0]
+    return parts.netloc.split(".")[0]
+
+
+def timestamp(milliseconds):
+    # the same representation as the dates of the archive pages, without a timezone and microseconds only when set
+    return str(datetime(1970, 1, 1) + timedelta(milliseconds=milliseconds)) if milliseconds else None
+
+
+def post_fields(post: dict, user: dict, url) -> dict:
+    """Fields of the raw dataset for a post of the `homepagePostsConnection` and the profile of its author."""
+    preview_image = post.get("previewImage") or {}
+    newsletter = (post.get("creator") or {}).get("newsletterV3") or user.get("newsletterV3") or {}
+    return {
+        "author": user.get("name"),
+        "author_avatar_url": IMAGE_URL % user["imageId"] if user.get("imageId") else None,
+        "membership_date": timestamp(user.get("mediumMemberAt")),
+        "author_bio": user.get("bio"),
+        "num_followers": (user.get("socialStats") or {}).get("followerCount"),
+        "v3_newsletter_subs": newsletter.get("subscribersCount"),
+        "date": timestamp(post.get("firstPublishedAt")),
+        "reading_time": post.get("readingTime"),
+        "title": post.get("title"),
+        "post_url": post.get("mediumUrl"),
+        "claps": post.get("clapCount"),
+        "num_unique_clappers": post.get("voterCount"),
+        "image_url": IMAGE_URL % preview_image["id"] if preview_image.get("id") else None,
+        "num_responses": (post.get("postResponses") or {}).get("count"),
+        "tags": str([tag["id"] for tag in post.get("tags") or []]),
+        "author_url": url,
+    }
+
+
+class ProfileScraper:
+    """
+    Scrapes the posts of author profiles through the GraphQL API of Medium with the recorded `UserProfileQuery`.
+
+    The authors are paged through their `homepagePostsFrom` cursors concurrently on an event loop running in a
+    background thread, so a single scraper can be shared by every thread of a run. The page requests of all the
+    authors are coalesced into batched GraphQL requests of up to `batch_size` operations, sent over one pooled
+    aiohttp session, or through the pooled session of a `FetchEngine` when `engine` is given, so its response cache,
+    rate limit and retries apply. Without an engine, `rate` limits the requests per second sent to the endpoint and
+    failed requests are retried `retries` times with a jittered exponential backoff. Either way only connection
+    errors, 429 and 5xx responses are retried, after at least their `Retry-After`. The responses are decoded with
+    orjson.
+
+    A batch groups whichever requests are pending at the time, so only runs with `batch_size=1` send requests that
+    can be replayed from the response cache.
+    """
+
+    def __init__(
+        self,
+        engine=None,
+        endpoint=GRAPHQL_URL,
+        operation=None,
+        batch_size=8,
+        batch_delay=0.005,
+        connections=4,
+        rate=None,
+        retries=3,
+        backoff=1.0,
+    ):
+        self.engine = engine
+        self.endpoint = endpoint
+        self.operation = operation or load_operation()
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.connections = connections
+        self.limiter = RateLimiter(rate)
+        self.retries = retries
+        self.backoff = backoff
+
+        self._session = None
+        self._pending = []
+        self._flush_handle = None
+        self._tasks = set()
+        self._loop = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def iter_posts(self, url, stop_at=None):
+        """Yield the raw fields of the author's posts from the newest one, until the post with the `stop_at` url."""
+        posts = self.aiter_posts(url, stop_at)
+        try:
+            while True:
+                try:
+                    yield self._run(posts.__anext__())
+                except StopAsyncIteration:
+                    return
+        finally:
+            self._run(posts.aclose())
+
+    def extract(self, url, stop_at=None) -> list[dict]:
+        return list(self.iter_posts(url, stop_at))
+
+    def scrape(self, urls, stop_at=None) -> dict:
+        """Posts of every author, scraped concurrently. `stop_at` maps the author urls to their last seen post urls."""
+        return self._run(self.ascrape(urls, stop_at))
+
+    async def ascrape(self, urls, stop_at=None) -> dict:
+        stop_at = stop_at or {}
+
+        async def collect(url):
+            return [post async for post in self.aiter_posts(url, stop_at.get(url))]
+
+        results = await asyncio.gather(*(collect(url) for url in urls))
+        return dict(zip(urls, results))
+
+    async def aiter_posts(self, url, stop_at=None):
+        cursor = None
+        while True:
+            data = await self.query(username=username(url), homepagePostsFrom=cursor)
+            user = data.get("userResult") or {}
+            if user.get("__typename") != "User":
+                raise LookupError("There is no Medium user at %s." % (url))
+
+            connection = user["homepagePostsConnection"]
+            with stage("post_process"):
+                page = [post_fields(post, user, url) for post in connection["posts"]]
+            for fields in page:
+                if stop_at is not None and fields["post_url"] == stop_at:
+                    return
+                yield fields
+
+            next_page = (connection.get("pagingInfo") or {}).get("next")
+            if not next_page or not connection["posts"]:
+                return
+            cursor = next_page["from"]
+
+    async def query(self, **variables) -> dict:
+        """Run the profile query with the variables as part of the next batch and return its `data`."""
+        operation = {**self.operation, "variables": {**self.operation["variables"], "id": None, **variables}}
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((operation, future))
+        if len(self._pending) >= self.batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            # wait a moment for the other authors to queue their pages into the same batch
+            self._flush_handle = asyncio.get_running_loop().call_later(self.batch_delay, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._send(batch))
+            # the loop only keeps weak references to the tasks
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, batch):
+        try:
+            body = orjson.dumps([operation for operation, _ in batch])
+            with stage("fetch"):
+                content = await self._post(body)
+            with stage("parse"):
+                results = orjson.loads(content)
+            if not isinstance(results, list):
+                results = [results]
+            if len(results) != len(batch):
+                raise GraphQLError("Sent %d operations and received %d results." % (len(batch), len(results)))
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if result.get("errors") and not result.get("data"):
+                future.set_exception(GraphQLError(result["errors"][0].get("message", result["errors"])))
+            else:
+                future.set_result(result.get("data") or {})
+
+    async def _post(self, body) -> bytes:
+        if self.engine is not None:
+            return await asyncio.get_running_loop().run_in_executor(self.engine.executor, self._post_with_engine, body)
+
+        if self._session is None:
+            connector = aiohttp.TCPConnector(limit=self.connections)
+            self._session = aiohttp.ClientSession(connector=connector, headers=HEADERS, raise_for_status=True)
+        for attempt in range(self.retries + 1):
+            await asyncio.sleep(self.limiter.reserve(self.endpoint))
+            try:
+                with timed_request("POST", self.endpoint) as timing:
+                    async with self._session.post(self.endpoint, data=body) as response:
+                        timing["status"] = response.status
+                        return await response.read()
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                # the same policy as `retry` of the engine: 429 and 5xx responses and connection errors are retried
+                if isinstance(e, aiohttp.ClientResponseError):
+                    transient, retry_after = retryable(e.status), (e.headers or {}).get("Retry-After")
+                else:
+                    transient, retry_after = isinstance(e, TRANSIENT_ERRORS), None
+                if attempt == self.retries or not transient:
+                    raise
+                delay = backoff_delay(attempt, self.backoff, retry_after)
+                logging.warning(f"Attempt {attempt + 1} failed ({e}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+    def _post_with_engine(self, body) -> bytes:
+        def send():
+            response = self.engine.request("POST", self.endpoint, data=body, headers=HEADERS)
+            response.raise_for_status()
+            return response.content
+
+        self.engine.limiter.wait(self.endpoint)
+        return retry(send, retries=self.engine.retries, backoff=self.backoff)
+
+    def _run(self, coroutine):
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name="profile-scraper", daemon=True)
+                self._thread.start()
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    def close(self):
+        with self._lock:
+            if self._loop is None:
+                return
+            if self._session is not None:
+                asyncio.run_coroutine_threadsafe(self._session.close(), self._loop).result()
+                self._session = None
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+            self._loop = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
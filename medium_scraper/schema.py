@@ -0,0 +1,118 @@
+import os
+
+import pyarrow.feather as feather
+
+# data processing
+import pandas as pd
+
+# columns and types of the raw dataset written by the pipeline
+RAW_SCHEMA = {
+    "author": "string",
+    "author_avatar_url": "string",
+    "membership_date": "string",
+    "author_bio": "string",
+    "num_followers": "int64",
+    "v3_newsletter_subs": "int64",
+    "date": "string",
+    "reading_time": "float64",
+    "title": "string",
+    "post_url": "string",
+    "claps": "int64",
+    "num_unique_clappers": "int64",
+    "image_url": "string",
+    "num_responses": "int64",
+    "tags": "string",
+    "author_url": "string",
+}
+
+# columns of the author profiles, which the raw dataset repeats on every post of the author
+PROFILE_COLUMNS = ["author", "author_avatar_url", "membership_date", "author_bio", "num_followers", "v3_newsletter_subs", "author_url"]
+# columns of the posts, the author of a post is the `author_id` of its profile
+NORMALIZED_POST_COLUMNS = ["date", "reading_time", "title", "post_url", "claps", "num_unique_clappers", "image_url", "num_responses"]
+
+# file names and typed read arguments of every dataset the pipeline writes,
+# `columnar` is the typed Feather (Arrow IPC) copy the pipeline writes next to the source file
+DATASETS = {
+    "processed": {
+        "filename": "processed_dataset.csv",
+        "columnar": "processed_dataset.feather",
+        "dtype": {"publication_url": "category", "reading_time": "int64", "claps": "float64"},
+        "parse_dates": ["date"],
+    },
+    "raw": {
+        "filename": "raw_dataset.csv",
+        "columnar": "raw_dataset.feather",
+        "dtype": {
+            "author": "category",
+            "author_avatar_url": "category",
+            "author_bio": "category",
+            "author_url": "category",
+            "num_followers": "int64",
+            "v3_newsletter_subs": "int64",
+            "reading_time": "float64",
+            "claps": "int64",
+            "num_unique_clappers": "int64",
+            "num_responses": "int64",
+        },
+        "parse_dates": ["date", "membership_date"],
+    },
+    "authors": {
+        "filename": "authors_processed.csv",
+        "columnar": "authors_processed.feather",
+        "dtype": {"num_followers": "int64", "v3_newsletter_subs": "int64", "num_articles": "int64"},
+        "parse_dates": [],
+    },
+    # the normalized layout of the raw dataset: every author and tag is stored once, the posts refer to them by key
+    "profiles": {
+        "filename": "author_profiles.csv",
+        "columnar": "author_profiles.feather",
+        "dtype": {"author_id": "int32", "author": "category", "num_followers": "int32", "v3_newsletter_subs": "int32"},
+        "parse_dates": ["membership_date"],
+    },
+    "posts": {
+        "filename": "posts.csv",
+        "columnar": "posts.feather",
+        "dtype": {
+            "post_id": "int32",
+            "author_id": "int32",
+            "reading_time": "float32",
+            "claps": "int32",
+            "num_unique_clappers": "int32",
+            "num_responses": "int32",
+        },
+        "parse_dates": ["date"],
+    },
+    "post_tags": {
+        "filename": "post_tags.csv",
+        "columnar": "post_tags.feather",
+        "dtype": {"post_id": "int32", "tag": "category"},
+        "parse_dates": [],
+    },
+}
+# datasets loaded by the dashboard, the raw dataset and its normalized layout are only read by the pipeline
+DASHBOARD_DATASETS = {name: DATASETS[name] for name in ("processed", "authors")}
+
+
+def read_source(path, name) -> pd.DataFrame:
+    """Read a CSV or parquet dataset file with the types of the `name` dataset."""
+    options = DATASETS[name]
+    if path.endswith(".parquet"):
+        frame = pd.read_parquet(path).astype(options["dtype"])
+        for column in options["parse_dates"]:
+            frame[column] = pd.to_datetime(frame[column])
+        return frame
+    return pd.read_csv(path, dtype=options["dtype"], parse_dates=options["parse_dates"])
+
+
+def write_columnar(frame: pd.DataFrame, path):
+    """
+    Write the frame as an uncompressed Feather file, so it can be memory-mapped when it is read.
+    The file is replaced atomically, readers that mapped the previous version keep reading it.
+    """
+    feather.write_feather(frame.reset_index(drop=True), path + ".tmp", compression="uncompressed")
+    os.replace(path + ".tmp", path)
+
+
+def read_columnar(path) -> pd.DataFrame:
+    """Memory-map a Feather file, the numeric columns without nulls share their memory with the mapping and are read-only."""
+    return feather.read_table(path, memory_map=True).to_pandas(split_blocks=True)
@@ -0,0 +1,48 @@
+import json
+import os
+import threading
+
+
+class CrawlState:
+    """
+    Persisted progress of the incremental crawls, stored as a JSON file.
+
+    Every entry is keyed by a url: authors keep their last seen post, fetched pages keep the ETag/Last-Modified
+    validators of their last response, and archive months are marked complete once they can not change anymore.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.entries = {}
+        self._lock = threading.Lock()
+
+        if path and os.path.exists(path):
+            with open(path, "r") as f:
+                self.entries = json.load(f)
+
+    def get(self, key) -> dict:
+        with self._lock:
+            return dict(self.entries.get(key, {}))
+
+    def update(self, key, **fields):
+        with self._lock:
+            self.entries.setdefault(key, {}).update({k: v for k, v in fields.items() if v is not None})
+
+    def headers(self, url) -> dict:
+        """Conditional request headers for the url, empty if it was never fetched."""
+        entry = self.get(url)
+        headers = {}
+        if "etag" in entry:
+            headers["If-None-Match"] = entry["etag"]
+        if "last_modified" in entry:
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            # write to a temporary file first, so a crashed run never leaves a truncated state behind
+            with open(self.path + ".tmp", "w") as f:
+                json.dump(self.entries, f, indent=2, sort_keys=True)
+            os.replace(self.path + ".tmp", self.path)
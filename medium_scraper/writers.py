@@ -0,0 +1,98 @@
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# data processing
+import pandas as pd
+
+from medium_scraper.metrics import stage
+
+# arrow types of the schema type names
+ARROW_TYPES = {"string": "string", "int64": "int64", "float64": "float64"}
+
+
+class ChunkWriter:
+    """
+    Buffers rows and writes them to the dataset file `chunk_size` rows at a time,
+    so only one chunk of the dataset is ever held in memory.
+    """
+
+    def __init__(self, path, schema: dict, chunk_size=1000):
+        self.path = path
+        self.schema = schema
+        self.columns = list(schema)
+        self.chunk_size = chunk_size
+        self.written = 0
+        self._rows = []
+
+    def write(self, row: dict):
+        self._rows.append(row)
+        self.written += 1
+        if len(self._rows) >= self.chunk_size:
+            self.flush()
+
+    def write_frame(self, frame: pd.DataFrame):
+        self.flush()
+        if len(frame):
+            with stage("write"):
+                self._write(frame.reindex(columns=self.columns))
+            self.written += len(frame)
+
+    def flush(self):
+        if self._rows:
+            with stage("write"):
+                self._write(pd.DataFrame(self._rows, columns=self.columns))
+            self._rows = []
+
+    def close(self):
+        self.flush()
+
+    def _write(self, frame):
+        raise NotImplementedError
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class CSVChunkWriter(ChunkWriter):
+    def __init__(self, path, schema: dict, chunk_size=1000):
+        super().__init__(path, schema, chunk_size)
+        self._header = True
+
+    def _write(self, frame):
+        frame.to_csv(self.path, mode="w" if self._header else "a", header=self._header, index=False)
+        self._header = False
+
+
+class ParquetChunkWriter(ChunkWriter):
+    """Writes every chunk as a row group of a single parquet file."""
+
+    def __init__(self, path, schema: dict, chunk_size=1000):
+        super().__init__(path, schema, chunk_size)
+        self.arrow_schema = pa.schema([(column, ARROW_TYPES[dtype]) for column, dtype in schema.items()])
+        self._writer = pq.ParquetWriter(path, self.arrow_schema)
+
+    def _write(self, frame):
+        self._writer.write_table(pa.Table.from_pandas(frame, schema=self.arrow_schema, preserve_index=False))
+
+    def close(self):
+        super().close()
+        self._writer.close()
+
+
+WRITERS = {"csv": CSVChunkWriter, "parquet": ParquetChunkWriter}
+
+
+def open_writer(path, schema: dict, format="csv", chunk_size=1000) -> ChunkWriter:
+    return WRITERS[format](path, schema, chunk_size)
+
+
+def iter_frames(path, format="csv", chunk_size=1000):
+    """Read a dataset file back `chunk_size` rows at a time."""
+    if format == "parquet":
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_size)
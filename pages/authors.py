@@ -1,29 +1,15 @@
-import os
-
-import dotenv
-from flask_caching import Cache
-
-# data visualization
-import plotly.express as px
-
 # dash imports for the dashboard app
 import dash
-from dash import Input, Output, dash_table, dcc, html
-
-# data processing
-import pandas as pd
+from dash import Input, Output, ctx, dash_table, dcc, html
 
-# load the dotenv
-dotenv.load_dotenv("../.env")
-DATASET_DIR = os.getenv("DATASET_PATH")
-# load the cache
-CACHE_CONFIG = {"CACHE_TYPE": "FileSystemCache", "CACHE_DIR": "cache"}
-app = dash.get_app()
-cache = Cache()
-cache.init_app(app.server, config=CACHE_CONFIG)
+import dashboard
+from dashboard.columns import PAGE_SIZE, TABLE_COLUMNS
+from dashboard.figures import cached_figure
+from dashboard.lazy import Lazy, lazy_import
 
-# constants for the page
-COLUMNS_TO_ROUND = ["average_claps", "average_unique_clappers", "average_reading_time", "average_responses"]
+# plotly and the datasets are imported by the first callback
+px = lazy_import("plotly.express")
+store = Lazy(dashboard.load)
 
 # register the page
 dash.register_page(__name__, "/authors")
@@ -43,7 +29,24 @@ layout = html.Div(
                             className="row mx-auto",
                         ),
                         html.Br(className="row"),
-                        html.Div([], id="search_results"),
+                        html.Div(
+                            [
+                                dash_table.DataTable(
+                                    id="authors-table",
+                                    columns=[{"name": i, "id": i} for i in TABLE_COLUMNS],
+                                    page_action="custom",
+                                    page_current=0,
+                                    page_size=PAGE_SIZE,
+                                    sort_action="custom",
+                                    sort_mode="single",
+                                    sort_by=[],
+                                    filter_action="custom",
+                                    filter_query="",
+                                    style_table={"overflowX": "auto"},
+                                )
+                            ],
+                            id="search_results",
+                        ),
                     ],
                     className="row w-auto border",
                 )
@@ -84,28 +87,8 @@ layout = html.Div(
 )
 
 
-@cache.memoize()
-def dataset_global_store():
-    dataset = pd.read_csv(os.path.join(DATASET_DIR, "raw_dataset.csv"))
-    return dataset.to_json(date_format="iso", orient="split")
-
-
-@cache.memoize()
-def authors_global_store():
-    authors = pd.read_csv(os.path.join(DATASET_DIR, "authors_processed.csv"))
-    return authors.to_json(date_format="iso", orient="split")
-
-
-@dash.callback(
-    Output(component_id="num_articles", component_property="children"),
-    Input("authors_signal", "data"),
-)
-def num_articles(author_df):
-    author_df = authors_global_store()
-    author_df = pd.read_json(author_df, orient="split")
-    author_df[COLUMNS_TO_ROUND] = author_df[COLUMNS_TO_ROUND].round(2)
-    author_df = author_df.sort_values(by="num_articles", ascending=False)
-    author_df = author_df.head(10)
+def num_articles(rankings):
+    author_df = rankings.top("num_articles")
     fig = px.bar(author_df, x="author", y="num_articles", title="Number of Articles", color="num_articles", text_auto=".2s")
 
     fig.update_traces(textfont_size=12, textangle=0, textposition="outside", cliponaxis=False, showlegend=False)
@@ -114,17 +97,8 @@ def num_articles(author_df):
     return dcc.Graph(figure=fig)
 
 
-@dash.callback(
-    Output(component_id="average_claps", component_property="children"),
-    Input("authors_signal", "data"),
-)
-def average_claps(author_df):
-    author_df = authors_global_store()
-    author_df = pd.read_json(author_df, orient="split")
-    author_df[COLUMNS_TO_ROUND] = author_df[COLUMNS_TO_ROUND].round(2)
-
-    author_df = author_df.sort_values(by="average_claps", ascending=False)
-    author_df = author_df.head(10)
+def average_claps(rankings):
+    author_df = rankings.top("average_claps")
 
     fig = px.bar(author_df, x="author", y="average_claps", title="Average Claps", color="average_claps", text_auto=".2s")
     fig.update_traces(textfont_size=12, textangle=0, textposition="outside", cliponaxis=False, showlegend=False)
@@ -133,17 +107,8 @@ def average_claps(author_df):
     return dcc.Graph(figure=fig)
 
 
-@dash.callback(
-    Output(component_id="average_unique_clappers", component_property="children"),
-    Input("authors_signal", "data"),
-)
-def average_unique_clappers(author_df):
-    author_df = authors_global_store()
-    author_df = pd.read_json(author_df, orient="split")
-    author_df[COLUMNS_TO_ROUND] = author_df[COLUMNS_TO_ROUND].round(2)
-
-    author_df = author_df.sort_values(by="average_unique_clappers", ascending=False)
-    author_df = author_df.head(10)
+def average_unique_clappers(rankings):
+    author_df = rankings.top("average_unique_clappers")
 
     fig = px.bar(
         author_df,
@@ -159,17 +124,8 @@ def average_unique_clappers(author_df):
     return dcc.Graph(figure=fig)
 
 
-@dash.callback(
-    Output(component_id="average_responses", component_property="children"),
-    Input("authors_signal", "data"),
-)
-def average_responses(author_df):
-    author_df = authors_global_store()
-    author_df = pd.read_json(author_df, orient="split")
-    author_df[COLUMNS_TO_ROUND] = author_df[COLUMNS_TO_ROUND].round(2)
-
-    author_df = author_df.sort_values(by="average_responses", ascending=False)
-    author_df = author_df.head(10)
+def average_responses(rankings):
+    author_df = rankings.top("average_responses")
 
     fig = px.bar(
         author_df, x="author", y="average_responses", title="Average Responses", color="average_responses", text_auto=".2s"
@@ -180,16 +136,8 @@ def average_responses(author_df):
     return dcc.Graph(figure=fig)
 
 
-@dash.callback(
-    Output(component_id="average_reading_time", component_property="children"),
-    Input("authors_signal", "data"),
-)
-def average_reading_time(author_df):
-    author_df = authors_global_store()
-    author_df = pd.read_json(author_df, orient="split")
-    author_df[COLUMNS_TO_ROUND] = author_df[COLUMNS_TO_ROUND].round(2)
-    author_df = author_df.sort_values(by="average_reading_time", ascending=False)
-    author_df = author_df.head(10)
+def average_reading_time(rankings):
+    author_df = rankings.top("average_reading_time")
 
     fig = px.bar(
         author_df,
@@ -205,16 +153,8 @@ def average_reading_time(author_df):
     return dcc.Graph(figure=fig)
 
 
-@dash.callback(
-    Output(component_id="v3_newsletter_subs", component_property="children"),
-    Input("authors_signal", "data"),
-)
-def v3_newsletter_subs(author_df):
-    author_df = authors_global_store()
-    author_df = pd.read_json(author_df, orient="split")
-    author_df[COLUMNS_TO_ROUND] = author_df[COLUMNS_TO_ROUND].round(2)
-    author_df = author_df.sort_values(by="v3_newsletter_subs", ascending=False)
-    author_df = author_df.head(10)
+def v3_newsletter_subs(rankings):
+    author_df = rankings.top("v3_newsletter_subs")
 
     fig = px.bar(
         author_df, x="author", y="v3_newsletter_subs", title="Newsletter Subscribers", color="v3_newsletter_subs", text_auto=".2s"
@@ -225,16 +165,8 @@ def v3_newsletter_subs(author_df):
     return dcc.Graph(figure=fig)
 
 
-@dash.callback(
-    Output(component_id="num_followers", component_property="children"),
-    Input("authors_signal", "data"),
-)
-def num_followers(author_df):
-    author_df = authors_global_store()
-    author_df = pd.read_json(author_df, orient="split")
-    author_df[COLUMNS_TO_ROUND] = author_df[COLUMNS_TO_ROUND].round(2)
-    author_df = author_df.sort_values(by="num_followers", ascending=False)
-    author_df = author_df.head(10)
+def num_followers(rankings):
+    author_df = rankings.top("num_followers")
 
     fig = px.bar(author_df, x="author", y="num_followers", title="Number of Followers", color="num_followers", text_auto=".2s")
     fig.update_traces(textfont_size=12, textangle=0, textposition="outside", cliponaxis=False, showlegend=False)
@@ -243,48 +175,42 @@ def num_followers(author_df):
     return dcc.Graph(figure=fig)
 
 
+CHARTS = [num_articles, average_claps, average_unique_clappers, average_responses, average_reading_time, v3_newsletter_subs, num_followers]
+
+
+@dash.callback(
+    Output(component_id="num_articles", component_property="children"),
+    Output(component_id="average_claps", component_property="children"),
+    Output(component_id="average_unique_clappers", component_property="children"),
+    Output(component_id="average_responses", component_property="children"),
+    Output(component_id="average_reading_time", component_property="children"),
+    Output(component_id="v3_newsletter_subs", component_property="children"),
+    Output(component_id="num_followers", component_property="children"),
+    Input("authors_signal", "data"),
+)
+@cached_figure
+def author_charts(signal):
+    # a single read of the rankings feeds every chart of the page
+    rankings = store.derived("author_rankings")
+    return tuple(chart(rankings) for chart in CHARTS)
+
+
 @dash.callback(
-    Output(component_id="search_results", component_property="children"),
+    Output("authors-table", "data"),
+    Output("authors-table", "page_count"),
+    Output("authors-table", "page_current"),
     Input(component_id="search_bar", component_property="value"),
+    Input("authors-table", "page_current"),
+    Input("authors-table", "page_size"),
+    Input("authors-table", "sort_by"),
+    Input("authors-table", "filter_query"),
     Input("authors_signal", "data"),
 )
-def search_bar(query, author_df):
-    author_df = authors_global_store()
-    author_df = pd.read_json(author_df, orient="split")
-    author_df = author_df.drop(columns=["author_bio", "author_url", "top10pr_tags"])
-    author_df = author_df[
-        [
-            "author",
-            "num_articles",
-            "num_followers",
-            "average_claps",
-            "average_unique_clappers",
-            "average_reading_time",
-            "average_responses",
-            "v3_newsletter_subs",
-            "membership_date",
-        ]
-    ]
-    COLUMNS_TO_ROUND = ["average_claps", "average_unique_clappers", "average_reading_time", "average_responses"]
-
-    author_df[COLUMNS_TO_ROUND] = author_df[COLUMNS_TO_ROUND].round(2)
-
-    if not query:
-        return dash_table.DataTable(
-            author_df.to_dict("records"),
-            [{"name": i, "id": i} for i in author_df.columns],
-            style_table={"overflowX": "auto"},
-        )
-    else:
-        query = " ".join(q.capitalize() for q in query.split())
-        query = query.strip()
-        L = len(query)
-        mask = author_df.author.apply(lambda x: x[:L]) == query
-
-        result = author_df[mask]
-
-        return dash_table.DataTable(
-            result.to_dict("records"),
-            [{"name": i, "id": i} for i in result.columns],
-            style_table={"overflowX": "auto"},
-        )
+def search_bar(query, page_current, page_size, sort_by, filter_query, author_df):
+    # a new search, sort or filter starts over from the first page
+    if "authors-table.page_current" not in ctx.triggered_prop_ids:
+        page_current = 0
+    index = store.derived("author_index")
+    author_df, page_count = index.page(query or "", page_current or 0, page_size or PAGE_SIZE, sort_by, filter_query)
+
+    return author_df.to_dict("records"), page_count, page_current
@@ -1,39 +1,26 @@
-# data visualization
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-
 # dash imports for the dashboard app
 import dash
-from dash import Input, Output, dcc, html
+from dash import Input, Output, ctx, dcc, html
+from dash.exceptions import PreventUpdate
 
 dash.register_page(__name__)
 
-import os
-
-import dotenv
-from flask_caching import Cache
+import dashboard
+from dashboard.figures import cached_figure
+from dashboard.lazy import Lazy, lazy_import
 
-# data processing
-import numpy as np
-import pandas as pd
-
-dotenv.load_dotenv("../.env")
-DATASET_DIR = os.getenv("DATASET_PATH")
-# caching
-CACHE_CONFIG = {
-    "CACHE_TYPE": "FileSystemCache",
-    "CACHE_DIR": "cache",
-    "CACHE_DEFAULT_TIMEOUT": 300,
-}
-app = dash.get_app()
-cache = Cache()
-cache.init_app(app.server, CACHE_CONFIG)
+# plotly, pandas and the datasets are imported by the first callback
+px = lazy_import("plotly.express")
+go = lazy_import("plotly.graph_objects")
+subplots = lazy_import("plotly.subplots")
+downsampling = lazy_import("dashboard.downsample")
+store = Lazy(dashboard.load)
 
 # page layout
 layout = html.Div(
     [
         dcc.Store("dataset_signal"),
+        dcc.Store("publication-counts"),
         html.H1("Publications"),
         html.Div([], id="num-articles-avg-earnings", className="row"),
         html.Div(
@@ -62,8 +49,8 @@ layout = html.Div(
         ),
         html.Div(
             [
-                html.Div([], id="pub-claps", className="col"),
-                html.Div([], id="pub-reading-time", className="col"),
+                html.Div([dcc.Graph(id="pub-claps-graph")], id="pub-claps", className="col"),
+                html.Div([dcc.Graph(id="pub-reading-time-graph")], id="pub-reading-time", className="col"),
             ],
             className="row",
         ),
@@ -72,85 +59,113 @@ layout = html.Div(
 )
 
 
-# cache dataset
-@cache.memoize()
-def dataset_storage():
-    # set dataset dataframe columns
-    dataset = pd.read_csv(os.path.join(DATASET_DIR, "processed_dataset.csv"))
-    return dataset.to_json(date_format="iso", orient="split")
-
-
-@dash.callback(Output("pub-claps", "children"), Input("publications-dropdown", "value"))
-def pub_claps(publication):
-    if publication:
-        dataset = dataset_storage()
-        dataset = pd.read_json(dataset, orient="split")
-        df = dataset.query(f"publication_url=='{publication}'")
-        fig = px.scatter(df, "date", "claps", title="Claps", labels=dict(date="Date", claps="Claps"))
+def pub_claps(df):
+    if df is not None:
+        df = downsampling.downsample(df, "date", "claps")
+        fig = px.scatter(
+            df,
+            "date",
+            "claps",
+            title="Claps",
+            labels=dict(date="Date", claps="Claps"),
+            render_mode="webgl" if len(df) > downsampling.WEBGL_THRESHOLD else "svg",
+        )
         fig.update_xaxes()
 
-        return dcc.Graph(figure=fig, id="pub-claps-graph")
+        return fig
     else:
-        return dcc.Graph(
-            figure=px.scatter(title="Claps", labels=dict(date="Date", claps="Claps")),
-            id="pub-claps-graph",
-        )
+        return px.scatter(title="Claps", labels=dict(date="Date", claps="Claps"))
 
 
-@dash.callback(Output("pub-reading-time", "children"), Input("publications-dropdown", "value"))
-def pub_reading_time(publication):
-    if publication:
-        dataset = dataset_storage()
-        dataset = pd.read_json(dataset, orient="split")
-        df = dataset.query(f"publication_url=='{publication}'")
+def pub_reading_time(df):
+    if df is not None:
+        df = downsampling.downsample(df, "date", "reading_time")
         fig = px.scatter(
             df,
             "date",
             "reading_time",
             title="Reading Time",
             labels=dict(date="Date", reading_time="Reading time"),
+            render_mode="webgl" if len(df) > downsampling.WEBGL_THRESHOLD else "svg",
         )
-        return dcc.Graph(figure=fig, id="pub-reading-time-graph")
+        return fig
     else:
-        return dcc.Graph(
-            figure=px.scatter(
-                title="Reading Time",
-                labels=dict(date="Date", reading_time="Reading time"),
-            ),
-            id="pub-reading-time-graph",
+        return px.scatter(
+            title="Reading Time",
+            labels=dict(date="Date", reading_time="Reading time"),
         )
 
 
+@cached_figure
+def publication_figures(publication, start=None, end=None):
+    # a single read of the publication's articles in the visible range feeds both scatter plots
+    df = store.database().publication_articles(publication, start=start, end=end) if publication else None
+    figures = pub_claps(df), pub_reading_time(df)
+    if start is not None or end is not None:
+        for fig in figures:
+            fig.update_xaxes(range=[start, end])
+    return figures
+
+
 @dash.callback(
+    Output("pub-claps-graph", "figure"),
+    Output("pub-reading-time-graph", "figure"),
+    Input("publications-dropdown", "value"),
+    Input("pub-claps-graph", "relayoutData"),
+    Input("pub-reading-time-graph", "relayoutData"),
+)
+def publication_drilldown(publication, claps_relayout, reading_time_relayout):
+    # zooming either graph re-queries the visible date range at full resolution and keeps both graphs in sync
+    if ctx.triggered_id in ("pub-claps-graph", "pub-reading-time-graph"):
+        date_range = downsampling.visible_range(claps_relayout if ctx.triggered_id == "pub-claps-graph" else reading_time_relayout)
+        if date_range is None or not publication:
+            raise PreventUpdate
+        return publication_figures(publication, *date_range)
+    return publication_figures(publication)
+
+
+# the article counts are already in the browser, so the total is looked up there without a request
+dash.clientside_callback(
+    """
+    function(publication, counts) {
+        if (!publication) {
+            return window.dash_clientside.no_update;
+        }
+        return "Total articles: " + ((counts || {})[publication] || 0);
+    }
+    """,
     Output("publication-total-articles", "children"),
     Input("publications-dropdown", "value"),
+    Input("publication-counts", "data"),
 )
-def pub_total_articles(publication):
-    if publication:
-        dataset = dataset_storage()
-        dataset = pd.read_json(dataset, orient="split")
-        count = dataset.publication_url.value_counts()[publication]
-        return "Total articles: " + str(count)
-
-
-@dash.callback(Output("publications-dropdown", "options"), Input("dataset_signal", "data"))
-def load_dropdown(signal):
-    dataset = dataset_storage()
-    dataset = pd.read_json(dataset, orient="split")
-    return dataset.publication_url.unique().tolist()
 
 
-@dash.callback(Output("avg-claps", "children"), Input("dataset_signal", "data"))
-def avg_claps(signal):
-    dataset = pd.read_json(dataset_storage(), orient="split")
-    sorted_pubs = sorted(dataset.publication_url.unique())
+@dash.callback(
+    Output("publications-dropdown", "options"),
+    Output("publication-counts", "data"),
+    Output("avg-claps", "children"),
+    Output("avg-reading-time", "children"),
+    Output("num-articles-avg-earnings", "children"),
+    Input("dataset_signal", "data"),
+)
+@cached_figure
+def publications_overview(signal):
+    # every landing chart is built from the same per-publication summary
+    summary = store.derived("publication_summary")
+    return (
+        summary.index.tolist(),
+        summary.num_articles.to_dict(),
+        avg_claps(summary),
+        avg_reading_time(summary),
+        num_articles_avg_earnings(summary),
+    )
 
-    avg_claps = dataset.groupby("publication_url").claps.agg(np.mean).reindex(sorted_pubs).reset_index(name="claps").round()
 
+def avg_claps(summary):
     fig = go.Figure()
     barplot = go.Bar(
-        x=avg_claps.publication_url,
-        y=avg_claps.claps,
+        x=summary.index,
+        y=summary.avg_claps.round(),
         marker={"color": px.colors.qualitative.Plotly},
         texttemplate="%{y}",
         hovertemplate="publication: <b>%{x}</b>",
@@ -164,19 +179,11 @@ def avg_claps(signal):
     return dcc.Graph(figure=fig, id="avg-claps-graph")
 
 
-@dash.callback(Output("avg-reading-time", "children"), Input("dataset_signal", "data"))
-def avg_reading_time(signal):
-    dataset = pd.read_json(dataset_storage(), orient="split")
-    sorted_pubs = sorted(dataset.publication_url.unique())
-
-    avg_reading_time = (
-        dataset.groupby("publication_url").reading_time.agg(np.mean).reindex(sorted_pubs).reset_index(name="reading_time").round()
-    )
-
+def avg_reading_time(summary):
     fig = go.Figure()
     barplot = go.Bar(
-        x=avg_reading_time.publication_url,
-        y=avg_reading_time.reading_time,
+        x=summary.index,
+        y=summary.avg_reading_time.round(),
         marker={"color": px.colors.qualitative.Plotly},
         texttemplate="%{y}",
         hovertemplate="publication: <b>%{x}</b>",
@@ -187,20 +194,8 @@ def avg_reading_time(signal):
     return dcc.Graph(figure=fig, id="avg-reading-time-graph")
 
 
-@dash.callback(Output("num-articles-avg-earnings", "children"), Input("dataset_signal", "data"))
-def num_articles_avg_earnings(signal):
-    dataset = pd.read_json(dataset_storage(), orient="split")
-
-    num_articles = dataset.publication_url.value_counts().reindex(sorted(dataset.publication_url.unique())).reset_index(name="num_articles")
-    num_articles["publication"] = num_articles["index"]
-    num_articles.drop(columns="index", inplace=True)
-
-    earnings_group = (
-        dataset.groupby("publication_url").claps.agg(sum).reindex(sorted(dataset.publication_url.unique())).reset_index(name="claps")
-    )
-    earnings_group["claps"] = earnings_group["claps"] * 0.1
-
-    fig = make_subplots(
+def num_articles_avg_earnings(summary):
+    fig = subplots.make_subplots(
         rows=1,
         cols=2,
         subplot_titles=["Number of published articles", "Average earnings"],
@@ -208,8 +203,8 @@ def num_articles_avg_earnings(signal):
     )
 
     barplot = go.Bar(
-        x=num_articles.publication,
-        y=num_articles.num_articles,
+        x=summary.index,
+        y=summary.num_articles,
         showlegend=False,
         hovertemplate="Publication: <b>%{x}</b><br># articles: <b>%{y}</b>",
         marker={"color": px.colors.qualitative.Plotly},
@@ -217,8 +212,8 @@ def num_articles_avg_earnings(signal):
     )
 
     pieplot = go.Pie(
-        labels=earnings_group.publication_url,
-        values=earnings_group.claps.round(),
+        labels=summary.index,
+        values=summary.earnings.round(),
         marker={"colors": px.colors.qualitative.Plotly},
         sort=False,
     )
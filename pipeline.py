@@ -1,43 +1,332 @@
+import argparse
 import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 
 from dotenv import load_dotenv
 
 # data processing
+import numpy as np
 import pandas as pd
 
 from medium_scraper import ProfileScraper
+from medium_scraper.cache import ResponseCache
+from medium_scraper.database import DATABASE_FILENAME, build_database
+from medium_scraper.fetch import FetchEngine
+from medium_scraper.metrics import registry
+from medium_scraper.schema import (
+    DASHBOARD_DATASETS,
+    DATASETS,
+    NORMALIZED_POST_COLUMNS,
+    PROFILE_COLUMNS,
+    RAW_SCHEMA,
+    read_source,
+    write_columnar,
+)
+from medium_scraper.state import CrawlState
+from medium_scraper.writers import iter_frames, open_writer
 
+# profile fields of the authors, repeated on every post of the raw dataset
+AUTHOR_COLUMNS = ["author", "membership_date", "author_bio", "num_followers", "v3_newsletter_subs", "author_url"]
+# counts of the raw dataset, a missing count is stored as 0
+COUNT_COLUMNS = [column for column, dtype in RAW_SCHEMA.items() if dtype == "int64"]
+# an author's top tags are the ones used in more than this ratio of the author's articles
+TOP_TAGS_RATIO = 0.1
+# posts waiting to be written, bounds the memory when the scrapers are faster than the writer
+QUEUE_SIZE = 1000
 
-def extract(urls):
-    scraper = ProfileScraper()
-    dataset = {}
-    for url in urls:
-        print("Scraping url:", url)
-        data = scraper.extract(url)
-        dataset[url] = data
 
-    data = []
-    for author_url, posts in dataset.items():
-        for post in posts:
-            post["author_url"] = author_url
-            data.append(post)
+class AuthorDone:
+    def __init__(self, url, posts, error=None, fatal=False):
+        self.url = url
+        self.posts = posts
+        self.error = error
+        # an error of the worker rather than of the author, the consumer re-raises it
+        self.fatal = fatal
 
-    dataframe = pd.DataFrame(data)
 
-    dataset_name = "raw_dataset.csv"
+def normalize(post: dict, author_url) -> dict:
+    row = {column: post.get(column) for column in RAW_SCHEMA}
+    row["author_url"] = author_url
+    # e.g. the newsletter subscribers of an author without a newsletter, the integer columns can not hold nulls
+    for column in COUNT_COLUMNS:
+        if row[column] is None:
+            row[column] = 0
+    return row
 
-    dataframe.to_csv(os.path.join(DATASET_PATH, dataset_name), index=False)
 
-    return dataframe
+def put_unless_stopped(posts: queue.Queue, stopped: threading.Event, item):
+    """Block until there is room in the queue, giving up once the consumer stopped reading it."""
+    while not stopped.is_set():
+        try:
+            return posts.put(item, timeout=0.1)
+        except queue.Full:
+            continue
+    raise RuntimeError("The consumer of the posts stopped.")
+
+
+def stream_posts(urls, workers=1, scraper_factory=ProfileScraper, state=None):
+    """
+    Scrape the authors with a pool of `workers` threads and yield every normalized post as soon as it is scraped.
+    The rate limit and the retries of the requests are the ones of the scraper. With a `CrawlState` every author is
+    only paged until its last seen post, and its newest post is recorded in the state.
+    """
+    local = threading.local()
+    posts = queue.Queue(maxsize=QUEUE_SIZE)
+    stopped = threading.Event()
+    put = partial(put_unless_stopped, posts, stopped)
+
+    def scrape_author(url, seen, newest):
+        stop_at = state.get(url).get("last_post_url") if state is not None else None
+        for post in local.scraper.iter_posts(url, stop_at=stop_at):
+            if post["post_url"] in seen:
+                continue
+            seen.add(post["post_url"])
+            if newest.get("date") is None or str(post["date"]) > str(newest["date"]):
+                newest.update(post)
+            put(normalize(post, url))
+
+    def scrape(url):
+        done = AuthorDone(url, 0)
+        try:
+            # every thread asks the factory for its scraper once, a thread-safe scraper may be handed to all of them
+            if not hasattr(local, "scraper"):
+                local.scraper = scraper_factory()
+            seen, newest = set(), {}
+            try:
+                scrape_author(url, seen, newest)
+            except Exception as e:
+                # an author that fails does not stop the others
+                done.error = e
+            done.posts = len(seen)
+            if done.error is None and state is not None and newest:
+                state.update(url, last_post_url=newest["post_url"], last_post_date=str(newest["date"]))
+        except BaseException as e:
+            done.error, done.fatal = e, True
+            raise
+        finally:
+            # the consumer waits for one marker per author
+            put(done)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(scrape, url) for url in urls]
+        try:
+            finished = 0
+            while finished < len(urls):
+                item = posts.get()
+                if not isinstance(item, AuthorDone):
+                    yield item
+                    continue
+                finished += 1
+                if item.fatal:
+                    raise item.error
+                if item.error is not None:
+                    print("An error occurred while scraping %s: %s" % (item.url, item.error))
+                else:
+                    print("Scraped url: %s (%d posts)" % (item.url, item.posts))
+        finally:
+            # the authors not started yet are dropped, the running ones give up at their next post
+            for future in futures:
+                future.cancel()
+            stopped.set()
+
+
+def extract(urls, workers=1, scraper_factory=ProfileScraper, state=None, format="csv", chunk_size=1000):
+    """
+    Stream the scraped posts of the authors into the raw dataset, `chunk_size` rows at a time as a CSV chunk or a
+    parquet row group, so the memory use does not grow with the number of authors. The dataset is written to a
+    temporary file and only replaces the old one at the end.
+
+    With a `CrawlState` the run is incremental: the new posts are upserted into the existing dataset by their
+    `post_url` instead of replacing it.
+    """
+    dataset_name = "raw_dataset.%s" % format
+    path = os.path.join(DATASET_PATH, dataset_name)
+    partial_path = path + ".part"
+
+    new_posts = set()
+    with open_writer(partial_path, RAW_SCHEMA, format, chunk_size) as writer:
+        for post in stream_posts(urls, workers, scraper_factory, state):
+            writer.write(post)
+            if state is not None:
+                new_posts.add(post["post_url"])
+        written = writer.written
+
+        if written and state is not None and os.path.exists(path):
+            upsert(writer, path, new_posts, format, chunk_size)
+
+    if written:
+        os.replace(partial_path, path)
+    elif os.path.exists(partial_path):
+        os.remove(partial_path)
+    if state is not None:
+        state.save()
+
+    return written
+
+
+def upsert(writer, path, new_posts, format="csv", chunk_size=1000, key="post_url"):
+    """Stream the existing dataset after the new rows, skipping its rows that were scraped again."""
+    new_rows = writer.written
+    for chunk in iter_frames(path, format, chunk_size):
+        writer.write_frame(chunk[~chunk[key].isin(new_posts)])
+    print("Upserted %d new rows into %d existing rows" % (len(new_posts), writer.written - new_rows))
+
+
+def explode_tags(tags: pd.Series) -> pd.Series:
+    """Split the stringified tag lists of the posts into one row per tag, indexed by the row of its post."""
+    return tags.fillna("").str.findall(r"['\"]([^'\"]+)['\"]").explode().dropna()
+
+
+def parse_tags(raw: pd.DataFrame) -> pd.DataFrame:
+    """Explode the stringified tag lists of the posts into one (author, tag) row per tag, with a categorical tag column."""
+    tags = explode_tags(raw["tags"])
+    return pd.DataFrame({"author": raw["author"].loc[tags.index].to_numpy(), "tag": tags.astype("category").to_numpy()})
+
+
+def aggregate_authors(raw: pd.DataFrame, tag_ratio=TOP_TAGS_RATIO) -> pd.DataFrame:
+    """
+    Per-author profile fields, post metrics and the tags used in more than `tag_ratio` of the author's articles,
+    computed with grouped aggregations over the raw dataset.
+    """
+    profiles = raw.drop_duplicates("author")[AUTHOR_COLUMNS].set_index("author")
+    metrics = raw.groupby("author", sort=False, observed=True).agg(
+        num_articles=("post_url", "size"),
+        average_claps=("claps", "mean"),
+        average_unique_clappers=("num_unique_clappers", "mean"),
+        average_reading_time=("reading_time", "mean"),
+        average_responses=("num_responses", "mean"),
+    )
+    authors = profiles.join(metrics)
+
+    counts = parse_tags(raw).groupby(["author", "tag"], observed=True).size().rename("count").reset_index()
+    lower_bound = np.ceil(counts["author"].map(authors["num_articles"]).astype("float64") * tag_ratio)
+    top_tags = counts[counts["count"] > lower_bound].sort_values("count", ascending=False, kind="stable")
+    top_tags = top_tags.groupby("author", sort=False, observed=True).apply(lambda group: dict(zip(group["tag"], group["count"])))
+    authors["top10pr_tags"] = top_tags.reindex(authors.index).map(lambda tags: str(tags if isinstance(tags, dict) else {}))
+
+    return authors.reset_index()
+
+
+def export_authors(dataset_dir, format="csv"):
+    raw_path = os.path.join(dataset_dir, "raw_dataset.%s" % format)
+    authors = aggregate_authors(read_source(raw_path, "raw"))
+    authors.to_csv(os.path.join(dataset_dir, DATASETS["authors"]["filename"]), index=False)
+    print("Aggregated %d authors from %s" % (len(authors), raw_path))
+
+
+def normalize_posts(raw: pd.DataFrame):
+    """
+    Split the raw dataset into the author profiles, the posts and the (post_id, tag) pairs of the posts. The profile
+    fields are stored once per author and the posts refer to them by an integer `author_id`, the tags are categorical.
+    """
+    raw = raw.reset_index(drop=True)
+    # the profiles are numbered in the order the authors first appear in, as the duplicates are dropped
+    author_ids, _ = pd.factorize(raw["author_url"], use_na_sentinel=False)
+    profiles = raw.drop_duplicates("author_url")[PROFILE_COLUMNS].reset_index(drop=True)
+    profiles.insert(0, "author_id", np.arange(len(profiles)))
+
+    posts = raw[NORMALIZED_POST_COLUMNS]
+    posts.insert(0, "post_id", np.arange(len(raw)))
+    posts.insert(1, "author_id", author_ids)
+
+    tags = explode_tags(raw["tags"])
+    post_tags = pd.DataFrame({"post_id": tags.index.to_numpy(), "tag": tags.to_numpy()})
+
+    return (
+        profiles.astype(DATASETS["profiles"]["dtype"]),
+        posts.astype(DATASETS["posts"]["dtype"]),
+        post_tags.astype(DATASETS["post_tags"]["dtype"]),
+    )
+
+
+def export_normalized(dataset_dir, format="csv"):
+    """Write the normalized profiles, posts and post tags of the raw dataset next to it, they are not committed."""
+    raw_path = os.path.join(dataset_dir, "raw_dataset.%s" % format)
+    profiles, posts, post_tags = normalize_posts(read_source(raw_path, "raw"))
+    for name, frame in (("profiles", profiles), ("posts", posts), ("post_tags", post_tags)):
+        frame.to_csv(os.path.join(dataset_dir, DATASETS[name]["filename"]), index=False)
+    print("Normalized %d posts into %d authors and %d post tags" % (len(posts), len(profiles), len(post_tags)))
+
+
+def export_columnar(dataset_dir):
+    """
+    Write a typed Feather copy of every dataset the dashboard reads, from the newest of its CSV or parquet files.
+    The dashboard memory-maps these copies instead of parsing the CSVs, the other datasets get none.
+    """
+    for name, options in DASHBOARD_DATASETS.items():
+        csv_path = os.path.join(dataset_dir, options["filename"])
+        sources = [path for path in (csv_path, os.path.splitext(csv_path)[0] + ".parquet") if os.path.exists(path)]
+        if not sources:
+            continue
+        source = max(sources, key=os.path.getmtime)
+        write_columnar(read_source(source, name), os.path.join(dataset_dir, options["columnar"]))
+        print("Exported %s to %s" % (source, options["columnar"]))
+
+
+def export_database(dataset_dir):
+    """Load the publication articles into the indexed SQLite store the dashboard queries."""
+    processed_path = os.path.join(dataset_dir, DATASETS["processed"]["filename"])
+    if not os.path.exists(processed_path):
+        return
+    num_articles = build_database(os.path.join(dataset_dir, DATABASE_FILENAME), read_source(processed_path, "processed"))
+    print("Stored %d articles in %s" % (num_articles, DATABASE_FILENAME))
 
 
 if __name__ == "__main__":
     load_dotenv()
     DATASET_PATH = os.getenv("DATASET_PATH")
 
+    parser = argparse.ArgumentParser(description="Scrape the authors in authors.txt into the raw dataset.")
+    parser.add_argument("--workers", type=int, default=4, help="number of authors scraped concurrently")
+    parser.add_argument("--rate", type=float, default=None, help="maximum requests per second sent to the GraphQL endpoint")
+    parser.add_argument("--retries", type=int, default=3, help="retries per request before giving up")
+    parser.add_argument("--incremental", action="store_true", help="only scrape the posts published since the last run")
+    parser.add_argument("--state", default=None, help="crawl state file of the incremental runs (default: DATASET_PATH/crawl_state.json)")
+    parser.add_argument("--cache", default=None, help="directory of the on-disk HTTP response cache (default: no cache)")
+    parser.add_argument("--cache-ttl", type=float, default=24 * 60 * 60, help="seconds until a cached response is refetched")
+    parser.add_argument("--offline", action="store_true", help="replay the run from the response cache without any network access")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv", help="file format of the raw dataset")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="rows per written CSV chunk or parquet row group")
+    parser.add_argument("--metrics", default=None, help="Prometheus text file the stage and request timings are written to")
+    args = parser.parse_args()
+
+    cache = None
+    if args.cache or args.offline:
+        cache = ResponseCache(args.cache or ".http_cache", ttl=args.cache_ttl, offline=args.offline)
+    # the profile requests only go through the pooled requests session of an engine to reach the response cache
+    engine = FetchEngine(workers=args.workers, rate=args.rate, retries=args.retries, cache=cache) if cache is not None else None
+
+    state = None
+    if args.incremental:
+        state = CrawlState(args.state or os.path.join(DATASET_PATH, "crawl_state.json"))
+
     with open("authors.txt", "r") as f:
         author_urls = f.readlines()
 
     author_urls = list(map(lambda s: s.strip().strip("\n"), author_urls))
 
-    extract(author_urls)
+    # one scraper for all the workers, so their page requests share the batches and the connection pool,
+    # cached runs send every operation alone to keep the requests replayable
+    scraper = ProfileScraper(engine=engine, batch_size=1 if engine is not None else 8, rate=args.rate, retries=args.retries)
+    extract(
+        author_urls,
+        workers=args.workers,
+        scraper_factory=lambda: scraper,
+        state=state,
+        format=args.format,
+        chunk_size=args.chunk_size,
+    )
+    scraper.close()
+    if cache is not None:
+        print("Response cache: %d hits, %d misses" % (cache.hits, cache.misses))
+
+    export_authors(DATASET_PATH, args.format)
+    export_normalized(DATASET_PATH, args.format)
+    export_columnar(DATASET_PATH)
+    export_database(DATASET_PATH)
+    if args.metrics:
+        registry.write(args.metrics)
+        print("Saved the metrics to %s" % args.metrics)
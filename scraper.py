@@ -1,90 +1,146 @@
 import datetime
 import logging
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import timedelta
 
-import requests
-from bs4 import BeautifulSoup
+from medium_scraper import parsing
+from medium_scraper.fetch import FetchEngine
+from medium_scraper.metrics import stage
+from medium_scraper.parsing import extract_posts, parse_posts
 
 # set the logging level
 # logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+# days after the end of a month until its archive page is considered final
+ARCHIVE_SETTLE_DAYS = 7
 
 
 class PublicationScraper:
     """
     A simple scraper that connects to the publication's archive
     and collect all the articles published this month
+
+    An engine created by the scraper is closed by `close`, or at the end of a `with` block.
     """
 
-    def __init__(self, publication: str, rollback=None, **kwargs):
+    def __init__(self, publication: str, rollback=None, engine=None, state=None, parser=None, **kwargs):
         self.publication_url = publication
         self.archive_url = os.path.join(self.publication_url, "archive")
         self.current_date = datetime.date.today()
+        # the engine can be shared between the scrapers to reuse its connection pool, its owner closes it
+        self.owns_engine = engine is None
+        self.engine = engine or FetchEngine()
+        # with a crawl state only the months that changed since the last run are scraped
+        self.state = state
 
         self.target_urls = []
         self.target_dates = []
-        self.pages = []
+        # "lxml" extracts the posts with lxml directly, any other BeautifulSoup tree builder goes through `get_data`
+        self.parser = parser or parsing.BACKEND
 
         self.data = {}
 
-        self.check_archive()
-        if not self.archive_available:
-            raise NotImplementedError("Scraping from the profile page (without archive) is not supported.")
+        try:
+            self.fetch(rollback)
+        except BaseException:
+            self.close()
+            raise
 
+    def fetch(self, rollback):
+        targets = []
         if rollback:
             for m in range(1, rollback + 2):
                 date = self.current_date.replace(day=1) - timedelta(1 * 30 * m)
-                target_url = os.path.join(self.archive_url, str(date.year), f"{str(date.month):0^2}")
-                print("date:", date)
-                print("url:", target_url)
+                target_url = os.path.join(self.archive_url, str(date.year), f"{date.month:02d}")
+                if self.state is not None and self.state.get(target_url).get("complete"):
+                    logger.info("skipping the completed month: %s", target_url)
+                    continue
+                logger.info("date: %s, url: %s", date, target_url)
 
-                self.target_dates.append(date)
-                self.target_urls.append(target_url)
+                targets.append((date, target_url))
 
-        for date, url in zip(self.target_dates, self.target_urls):
-            logging.info(f"Constructed the target url: {url}")
-            req = requests.get(url)
-            logging.info(f"Sent the GET request, status code: {req.status_code}")
+        # the archive check and every month are fetched concurrently
+        archive = self.engine.submit(self.archive_url)
+        futures = {self.engine.submit(url, state=self.state): (date, url) for date, url in targets}
 
-            print("req.url", req.url)
-            print(
-                "os.path.join(self.archive_url, str(date.year))",
-                os.path.join(self.archive_url, str(date.year)),
-            )
+        self.check_archive(archive.result())
+        if not self.archive_available:
+            raise NotImplementedError("Scraping from the profile page (without archive) is not supported.")
+
+        for future in as_completed(futures):
+            date, url = futures[future]
+            req = future.result()
+            logger.info("Received the response of %s, status code: %d", url, req.status_code)
+
+            if req.status_code == 304:
+                logger.info("not modified since the last run: %s", url)
+                continue
 
             if req.url == os.path.join(self.archive_url, str(date.year)):
                 raise NotImplementedError("Scraping just from the year is not implemented yet. (URL: %s)" % (self.publication_url))
 
-            page = BeautifulSoup(req.content, "html.parser")
-            logging.info("Initialized the beautifulsoup")
-            self.pages.append(page)
+            # the fields are extracted as soon as the page arrives, the parsed tree is not kept around
+            self.data[date] = self.extract(req.content)
+            logger.info("Extracted %d posts from %s", len(self.data[date]), url)
+
+            if self.state is not None and self.month_settled(date):
+                self.state.update(url, complete=True)
+
+        # the pages are handled in the order they arrive, keep the scraped months in the order of the targets
+        self.target_dates = [date for date, _ in targets if date in self.data]
+        self.target_urls = [url for date, url in targets if date in self.data]
+        self.data = {date: self.data[date] for date in self.target_dates}
+
+    def month_settled(self, date) -> bool:
+        """Whether the archive of the month can not get new posts anymore."""
+        next_month = (date.replace(day=28) + timedelta(days=4)).replace(day=1)
+        return self.current_date >= next_month + timedelta(days=ARCHIVE_SETTLE_DAYS)
 
-    def check_archive(self):
-        r = requests.get(self.archive_url)
+    def check_archive(self, response=None):
+        r = response if response is not None else self.engine.get(self.archive_url)
         if "PAGE NOT FOUND" in r.text and "404" in r.text:
             self.archive_available = False
         else:
             self.archive_available = True
 
     def scrape(self):
-        for page, date, url in zip(self.pages, self.target_dates, self.target_urls):
-            print("current date:", date)
-            print("current url:", url)
-            posts = self.get_posts(page)
-            data = self.get_data(posts)
-            self.data[date] = data
+        # the pages are already extracted while they are fetched
         return self.data
 
+    def close(self):
+        if self.owns_engine:
+            self.engine.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
     def scrape_profile(self):
         """
         It should be noted that the Medium sends a POST request to the -author_medium_url-/_/batch with some authentication/bot analysis
         headers. So it's highly possible to reverse-engineer the API and imitate a real client to collect the data.
+        The author profiles are scraped through that GraphQL API by `medium_scraper.ProfileScraper`.
         """
-        raise NotImplementedError("Not implemented yet.")
-
-    def get_posts(self, page) -> list[str]:
-        posts = page.find_all("div", {"streamItem--postPreview"})
-        return posts
+        raise NotImplementedError("Use medium_scraper.ProfileScraper to scrape the author profiles.")
+
+    def extract(self, content) -> list[dict]:
+        """Post-processed fields of every post on an archive page, extracted with the `parser` backend."""
+        if self.parser == "lxml":
+            with stage("parse"):
+                samples = extract_posts(content)
+            with stage("post_process"):
+                return [self.post_process(sample) for sample in samples]
+        with stage("parse"):
+            posts = self.get_posts(content)
+        with stage("post_process"):
+            return self.get_data(posts)
+
+    def get_posts(self, content) -> list:
+        return parse_posts(content, self.parser)
 
     def get_data(self, posts) -> list[dict]:
         samples = []
@@ -95,8 +151,7 @@ class PublicationScraper:
             reading_time = uicaption.find("span", {"class": "readingTime"})["title"]
 
             article_content = post.find("div", {"class": "postArticle-content"})
-            section = article_content.select("section.section > div.section-content > div.section-inner")
-            title = section[0].select("h3").text
+            title = article_content.find("h3").text
             post_url = article_content.parent["href"]
             preview_image_url = article_content.find("figure").find("img")["src"]
             claps = post.find("div", {"class": "multirecommend"}).find_all("span")[-1].text
@@ -118,6 +173,8 @@ class PublicationScraper:
         return samples
 
     def post_process(self, sample: dict):
+        for field in ("author", "title", "claps"):
+            sample[field] = sample[field].strip()
         sample["date"] = sample["date"].split("T")[0]
         sample["reading_time"] = " ".join(sample["reading_time"].split()[:-1])
         sample["post_url"] = sample["post_url"].split("?source=collection_archive")[0]
@@ -125,23 +182,45 @@ class PublicationScraper:
 
 
 class MediumScraper:
-    def __init__(self, publications, suppress=False, **publication_scraper_kwargs):
+    """
+    Scrapes the archives of the publications concurrently through one shared engine, which is closed by `close`, or
+    at the end of a `with` block, when the scraper created it.
+    """
+
+    def __init__(self, publications, suppress=False, engine=None, **publication_scraper_kwargs):
         self.publications = publications
         self.archives = list(map(lambda x: os.path.join(x, "archive"), publications))
+        self.owns_engine = engine is None
+        self.engine = engine or FetchEngine()
         self.scrapers = []
         self.data = {}
-        for publication in publications:
-            if suppress:
-                try:
-                    scraper = PublicationScraper(publication, **publication_scraper_kwargs)
-                except Exception as e:
-                    print("An error occurred:", e)
-                    print("Removing the publication: %s" % (publication))
-                    self.publications.remove(publication)
-            else:
-                scraper = PublicationScraper(publication, **publication_scraper_kwargs)
 
-            self.scrapers.append((publication, scraper))
+        try:
+            self.setup(suppress, publication_scraper_kwargs)
+        except BaseException:
+            self.close()
+            raise
+
+    def setup(self, suppress, publication_scraper_kwargs):
+        # every publication is set up in its own thread, their pages are all fetched through the shared engine
+        with ThreadPoolExecutor(max_workers=max(len(self.publications), 1)) as executor:
+            futures = [
+                executor.submit(PublicationScraper, publication, engine=self.engine, **publication_scraper_kwargs)
+                for publication in self.publications
+            ]
+            for publication, future in zip(list(self.publications), futures):
+                if suppress:
+                    try:
+                        scraper = future.result()
+                    except Exception as e:
+                        logger.warning("An error occurred: %s", e)
+                        logger.warning("Removing the publication: %s", publication)
+                        self.publications.remove(publication)
+                        continue
+                else:
+                    scraper = future.result()
+
+                self.scrapers.append((publication, scraper))
 
     def scrape(self):
         for pub, scraper in self.scrapers:
@@ -150,3 +229,13 @@ class MediumScraper:
                 self.data[pub].append(data)
             else:
                 self.data[pub] = []
+
+    def close(self):
+        if self.owns_engine:
+            self.engine.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
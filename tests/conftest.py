@@ -0,0 +1,83 @@
+import asyncio
+import json
+import os
+import threading
+import time
+
+import pytest
+from aiohttp import web
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+class MockGraphQL:
+    """
+    Local stand-in of the GraphQL endpoint of Medium, answering the `UserProfileQuery` operations with the recorded
+    responses of `fixtures/graphql_responses.json`, by username and `homepagePostsFrom` cursor. Every received batch
+    of operations is kept in `batches` with the time it was received in `times`, and the next `failures` requests are
+    answered with `failure_status` and `failure_headers`, a 503 by default.
+    """
+
+    def __init__(self, responses):
+        self.responses = responses
+        self.batches = []
+        self.times = []
+        self.failures = 0
+        self.failure_status = 503
+        self.failure_headers = {}
+        self.url = None
+        self._loop = asyncio.new_event_loop()
+        self._runner = None
+
+    def result(self, variables) -> dict:
+        pages = self.responses.get(variables.get("username"))
+        if pages is None:
+            return {"data": {"userResult": {"__typename": "NotFound"}}}
+        return pages[variables.get("homepagePostsFrom") or ""]
+
+    async def handle(self, request):
+        self.times.append(time.monotonic())
+        if self.failures > 0:
+            self.failures -= 1
+            return web.Response(status=self.failure_status, headers=self.failure_headers)
+        operations = await request.json()
+        if not isinstance(operations, list):
+            operations = [operations]
+        self.batches.append(operations)
+        return web.json_response([self.result(operation["variables"]) for operation in operations])
+
+    async def _start(self):
+        app = web.Application()
+        app.router.add_post("/_/graphql", self.handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        host, port = self._runner.addresses[0][:2]
+        self.url = "http://%s:%d/_/graphql" % (host, port)
+
+    def start(self):
+        threading.Thread(target=self._loop.run_forever, daemon=True).start()
+        asyncio.run_coroutine_threadsafe(self._start(), self._loop).result()
+        return self
+
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+    @property
+    def operations(self) -> list:
+        return [operation for batch in self.batches for operation in batch]
+
+
+@pytest.fixture(scope="session")
+def recorded_responses():
+    with open(os.path.join(FIXTURES, "graphql_responses.json")) as f:
+        return json.load(f)
+
+
+@pytest.fixture
+def graphql_server(recorded_responses):
+    server = MockGraphQL(recorded_responses).start()
+    yield server
+    server.stop()
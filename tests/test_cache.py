@@ -0,0 +1,40 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from medium_scraper.cache import ResponseCache
+
+
+def response(content=b"{}", url="https://medium.com/_/graphql"):
+    response = requests.Response()
+    response.status_code = 200
+    response.reason = "OK"
+    response.url = url
+    response._content = content
+    return response
+
+
+def test_concurrent_puts_of_the_same_key(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    key = cache.key("POST", "https://medium.com/_/graphql", b"[]")
+
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        list(executor.map(lambda i: cache.put(key, response(b"x" * i)), range(64)))
+
+    assert cache.get(key)["content"].startswith(b"x")
+    assert not [name for _, _, files in os.walk(tmp_path) for name in files if name.endswith(".tmp")]
+
+
+def test_evict_tolerates_removed_entries(tmp_path):
+    cache = ResponseCache(str(tmp_path), max_bytes=2000)
+    keys = [cache.key("GET", "https://medium.com/%d" % i) for i in range(10)]
+    for key in keys[:5]:
+        cache.put(key, response(b"x" * 200))
+    # another process evicted an entry under this one
+    os.remove(cache.path(keys[0]))
+    for key in keys[5:]:
+        cache.put(key, response(b"x" * 200))
+
+    assert cache.size <= 2000
+    assert cache.get(keys[-1]) is not None
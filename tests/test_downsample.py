@@ -0,0 +1,49 @@
+# data processing
+import numpy as np
+import pandas as pd
+
+from dashboard.downsample import downsample, lttb, visible_range
+
+
+def test_lttb_keeps_the_ends_and_the_peaks():
+    y = np.zeros(1000)
+    y[500] = 100.0
+    selected = lttb(np.arange(1000), y, 50)
+
+    assert len(selected) == 50
+    assert selected[0] == 0 and selected[-1] == 999
+    assert 500 in selected
+    assert np.all(np.diff(selected) > 0)
+
+
+def test_lttb_keeps_every_point_under_the_threshold():
+    assert lttb(np.arange(10), np.arange(10), 20).tolist() == list(range(10))
+
+
+def test_downsample_sorts_unsorted_input():
+    rng = np.random.default_rng(0)
+    dates = pd.Timestamp("2023-01-01") + pd.to_timedelta(rng.permutation(5000), unit="h")
+    claps = rng.integers(0, 100, 5000)
+    claps[dates.argmax()] = 10_000
+    df = pd.DataFrame({"date": dates, "claps": claps})
+
+    sampled = downsample(df, "date", "claps", max_points=100)
+
+    assert len(sampled) == 100
+    assert sampled["date"].is_monotonic_increasing
+    assert sampled["date"].iloc[0] == dates.min() and sampled["date"].iloc[-1] == dates.max()
+    assert sampled["claps"].max() == 10_000
+
+
+def test_downsample_sorts_small_frames_too():
+    df = pd.DataFrame({"date": pd.to_datetime(["2023-03-01", "2023-01-01", "2023-02-01"]), "claps": [3, 1, 2]})
+
+    assert downsample(df, "date", "claps")["claps"].tolist() == [1, 2, 3]
+
+
+def test_visible_range():
+    assert visible_range(None) is None
+    assert visible_range({"yaxis.range[0]": 0, "yaxis.range[1]": 1}) is None
+    assert visible_range({"xaxis.autorange": True}) == (None, None)
+    assert visible_range({"xaxis.range[0]": "2023-01-01", "xaxis.range[1]": "2023-02-01"}) == ("2023-01-01", "2023-02-01")
+    assert visible_range({"xaxis.range": ["2023-01-01", "2023-02-01"]}) == ("2023-01-01", "2023-02-01")
@@ -0,0 +1,81 @@
+import pytest
+
+from dashboard.cache import DiskTier, MemoryTier, TieredCache
+from dashboard.figures import FigureCache, code_version
+
+
+class Store:
+    def __init__(self, version="data-1"):
+        self.version = version
+        self.listeners = []
+
+    def refresh(self):
+        return False
+
+    def on_reload(self, callback):
+        self.listeners.append(callback)
+
+
+@pytest.fixture
+def directory(tmp_path):
+    return str(tmp_path / "figures")
+
+
+def figure_cache(directory, store=None, version="code-1"):
+    return FigureCache(store=store or Store(), cache=TieredCache([MemoryTier(), DiskTier(directory)]), version=version)
+
+
+def counting_callback(calls):
+    def figure(value):
+        calls.append(value)
+        return {"data": [{"y": [value]}]}
+
+    return figure
+
+
+def test_workers_share_the_disk_tier(directory):
+    calls = []
+    first = figure_cache(directory).cached(counting_callback(calls))
+    second = figure_cache(directory).cached(counting_callback(calls))
+
+    assert first(1) == second(1)
+    assert calls == [1]
+
+
+def test_new_code_does_not_read_the_figures_of_the_old_one(directory):
+    calls = []
+    figure_cache(directory, version="code-1").cached(counting_callback(calls))(1)
+    figure_cache(directory, version="code-2").cached(counting_callback(calls))(1)
+
+    assert calls == [1, 1]
+
+
+def test_new_data_does_not_read_the_figures_of_the_old_one(directory):
+    calls = []
+    store = Store()
+    figure = figure_cache(directory, store).cached(counting_callback(calls))
+    figure(1)
+    store.version = "data-2"
+    figure(1)
+
+    assert calls == [1, 1]
+
+
+def test_disk_tier_evicts_the_least_recently_read(directory):
+    tier = DiskTier(directory, max_bytes=1000)
+    for i in range(5):
+        tier.put("key-%d" % i, "x" * 300)
+
+    assert tier.evictions > 0
+    assert tier.files.size <= 1000
+    assert tier.get("key-4") == "x" * 300
+
+
+def test_code_version_changes_with_the_sources(tmp_path):
+    (tmp_path / "pages").mkdir()
+    source = tmp_path / "pages" / "home.py"
+    source.write_text("x = 1\n")
+    before = code_version(str(tmp_path), ["pages"])
+    source.write_text("x = 2\n")
+
+    assert code_version(str(tmp_path), ["pages"]) != before
@@ -0,0 +1,75 @@
+# dash imports for the dashboard app
+from dash import Dash, Input, Output, html
+
+from dashboard.instrument import instrument
+from medium_scraper.metrics import Registry
+
+
+def test_asking_twice_returns_the_same_metric():
+    registry = Registry()
+
+    assert registry.counter("requests_total", "Requests.") is registry.counter("requests_total", "Requests.")
+
+
+def test_counter_exposition():
+    registry = Registry()
+    counter = registry.counter("requests_total", "Requests.", ["path"])
+    counter.inc(path='/a"b')
+    counter.inc(2, path='/a"b')
+
+    assert counter.value(path='/a"b') == 3
+    assert registry.expose() == '# HELP requests_total Requests.\n# TYPE requests_total counter\nrequests_total{path="/a\\"b"} 3.0\n'
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = Registry()
+    histogram = registry.histogram("latency_seconds", "Latency.", ["stage"], buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.7, 5.0):
+        histogram.observe(value, stage="fetch")
+
+    assert histogram.count(stage="fetch") == 4
+    assert registry.expose().splitlines()[2:] == [
+        'latency_seconds_bucket{stage="fetch",le="0.1"} 1',
+        'latency_seconds_bucket{stage="fetch",le="1.0"} 3',
+        'latency_seconds_bucket{stage="fetch",le="+Inf"} 4',
+        'latency_seconds_sum{stage="fetch"} 6.25',
+        'latency_seconds_count{stage="fetch"} 4',
+    ]
+
+
+def test_write_replaces_the_file(tmp_path):
+    registry = Registry()
+    registry.counter("runs_total", "Runs.").inc()
+    path = str(tmp_path / "scraper.prom")
+    registry.write(path)
+
+    with open(path) as f:
+        assert f.read() == registry.expose()
+    assert not (tmp_path / "scraper.prom.tmp").exists()
+
+
+def test_metrics_endpoint_times_the_callbacks():
+    app = Dash(__name__)
+    app.layout = html.Div([html.Div(id="metrics-input"), html.Div(id="metrics-output")])
+
+    @app.callback(Output("metrics-output", "children"), Input("metrics-input", "children"))
+    def echo_for_metrics(value):
+        return value
+
+    instrument(app)
+    client = app.server.test_client()
+    client.get("/")
+    body = {
+        "output": "metrics-output.children",
+        "outputs": {"id": "metrics-output", "property": "children"},
+        "inputs": [{"id": "metrics-input", "property": "children", "value": "x"}],
+        "changedPropIds": ["metrics-input.children"],
+    }
+    assert client.post("/_dash-update-component", json=body).status_code == 200
+
+    response = client.get("/metrics")
+    metrics = response.get_data(as_text=True)
+    assert response.mimetype == "text/plain"
+    for phase in ("deserialize", "compute", "total"):
+        assert 'dashboard_callback_seconds_count{callback="echo_for_metrics",phase="%s"} 1' % phase in metrics
+    assert 'dashboard_callback_payload_bytes_count{callback="echo_for_metrics"} 1' in metrics
@@ -0,0 +1,47 @@
+import os
+
+import pytest
+
+from medium_scraper import parsing
+from scraper import PublicationScraper
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+@pytest.fixture(scope="module")
+def page():
+    with open(os.path.join(FIXTURES, "archive_page.html"), "rb") as f:
+        return f.read()
+
+
+@pytest.fixture(scope="module")
+def scraper():
+    # only the parsing methods are used, the archive is not fetched
+    return PublicationScraper.__new__(PublicationScraper)
+
+
+def test_extracts_the_fields_of_the_posts(page, scraper):
+    posts = scraper.get_data(parsing.parse_posts(page))
+
+    assert [post["title"] for post in posts] == ["Post number 1 of the synthetic archive", "Pandas & SQL: a   guide"]
+    assert posts[0] == {
+        "author": "Author 1",
+        "date": "2022-12-02",
+        "reading_time": "4 min",
+        "post_url": "https://example.medium.com/post-%012x" % 7919,
+        "title": "Post number 1 of the synthetic archive",
+        "preview_image_url": "https://cdn-images-1.medium.com/fit/t/1600/480/%012x.jpeg" % 7919,
+        "claps": "1.2K",
+    }
+
+
+def test_the_strained_tree_finds_the_same_posts(page, scraper):
+    assert scraper.get_data(parsing.parse_posts(page)) == scraper.get_data(parsing.parse_posts(page, strained=False))
+
+
+@pytest.mark.skipif(parsing.BACKEND != "lxml", reason="lxml is not installed")
+def test_lxml_extracts_the_same_fields_as_beautifulsoup(page, scraper):
+    lxml_posts = [scraper.post_process(sample) for sample in parsing.extract_posts(page)]
+
+    assert lxml_posts == scraper.get_data(parsing.parse_posts(page))
+    assert lxml_posts == scraper.get_data(parsing.parse_posts(page, "lxml"))
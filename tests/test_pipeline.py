@@ -0,0 +1,104 @@
+import aiohttp
+import pytest
+import requests
+
+import pipeline
+from medium_scraper.fetch import FetchEngine
+from medium_scraper.profile import ProfileScraper
+from medium_scraper.schema import RAW_SCHEMA
+from pipeline import stream_posts
+
+ALICE = "https://alice.medium.com/"
+BOB = "https://medium.com/@bob"
+
+
+class FakeScraper:
+    def __init__(self, posts_per_author=2):
+        self.posts_per_author = posts_per_author
+        self.urls = []
+
+    def iter_posts(self, url, stop_at=None):
+        self.urls.append(url)
+        for i in range(self.posts_per_author):
+            yield {"post_url": "%spost-%d" % (url, i), "date": "2023-03-23 06:32:53"}
+
+
+def test_streams_the_normalized_posts_of_every_author(graphql_server):
+    with ProfileScraper(endpoint=graphql_server.url) as scraper:
+        posts = list(stream_posts([ALICE, "https://medium.com/@nobody", BOB], workers=2, scraper_factory=lambda: scraper))
+
+    # an author that fails does not stop the others
+    assert sorted(post["post_url"] for post in posts) == sorted(
+        ["https://medium.com/@alice/post-%d" % i for i in range(1, 6)] + ["https://medium.com/@bob/post-%d" % i for i in range(1, 3)]
+    )
+    assert all(list(post) == list(RAW_SCHEMA) for post in posts)
+    assert {post["author_url"] for post in posts} == {ALICE, BOB}
+
+
+def test_rate_limits_the_requests_to_the_endpoint(graphql_server):
+    with ProfileScraper(endpoint=graphql_server.url, batch_size=1, rate=10) as scraper:
+        list(stream_posts([ALICE, BOB], workers=2, scraper_factory=lambda: scraper))
+
+    intervals = [later - earlier for earlier, later in zip(graphql_server.times, graphql_server.times[1:])]
+    assert len(intervals) == 2
+    assert min(intervals) >= 0.09
+
+
+def test_retries_the_failed_requests(graphql_server):
+    graphql_server.failures = 2
+    with ProfileScraper(endpoint=graphql_server.url, retries=2, backoff=0.01) as scraper:
+        assert len(scraper.extract(BOB)) == 2
+
+
+def test_gives_up_after_the_retries(graphql_server):
+    graphql_server.failures = 2
+    with ProfileScraper(endpoint=graphql_server.url, retries=1, backoff=0.01) as scraper:
+        with pytest.raises(aiohttp.ClientResponseError):
+            scraper.extract(BOB)
+
+
+def test_waits_the_retry_after_of_rate_limited_requests(graphql_server):
+    graphql_server.failures, graphql_server.failure_status = 1, 429
+    graphql_server.failure_headers = {"Retry-After": "0.2"}
+    with ProfileScraper(endpoint=graphql_server.url, retries=1, backoff=0.01) as scraper:
+        assert len(scraper.extract(BOB)) == 2
+
+    assert graphql_server.times[1] - graphql_server.times[0] >= 0.2
+
+
+@pytest.mark.parametrize("use_engine, error", [(False, aiohttp.ClientResponseError), (True, requests.HTTPError)])
+def test_client_errors_are_not_retried(graphql_server, use_engine, error):
+    graphql_server.failures, graphql_server.failure_status = 1, 404
+    with FetchEngine(workers=2) as engine:
+        with ProfileScraper(engine=engine if use_engine else None, endpoint=graphql_server.url, retries=2, backoff=0.01) as scraper:
+            with pytest.raises(error):
+                scraper.extract(BOB)
+
+    assert len(graphql_server.times) == 1
+
+
+def test_engine_retries_the_rate_limited_requests(graphql_server):
+    graphql_server.failures, graphql_server.failure_status = 2, 429
+    with FetchEngine(workers=2) as engine, ProfileScraper(engine=engine, endpoint=graphql_server.url, retries=2, backoff=0.01) as scraper:
+        assert len(scraper.extract(BOB)) == 2
+
+
+def test_reraises_the_errors_of_the_workers():
+    def scraper_factory():
+        raise ValueError("no scraper")
+
+    with pytest.raises(ValueError, match="no scraper"):
+        list(stream_posts([ALICE, BOB], workers=2, scraper_factory=scraper_factory))
+
+
+def test_closing_the_stream_drops_the_authors_not_started(monkeypatch):
+    # the worker blocks on the second post of the first author until the consumer reads on
+    monkeypatch.setattr(pipeline, "QUEUE_SIZE", 1)
+    scraper = FakeScraper()
+    urls = ["https://medium.com/@author%d" % i for i in range(10)]
+    stream = stream_posts(urls, scraper_factory=lambda: scraper)
+
+    assert next(stream)["post_url"] == urls[0] + "post-0"
+    stream.close()
+
+    assert scraper.urls == urls[:1]
@@ -0,0 +1,100 @@
+import pytest
+
+from medium_scraper.fetch import FetchEngine
+from medium_scraper.profile import ProfileScraper
+
+ALICE = "https://alice.medium.com/"
+BOB = "https://medium.com/@bob"
+
+
+@pytest.fixture
+def scraper(graphql_server):
+    scraper = ProfileScraper(endpoint=graphql_server.url)
+    yield scraper
+    scraper.close()
+
+
+class RecordingEngine(FetchEngine):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.sent = []
+
+    def request(self, method, url, **kwargs):
+        self.sent.append((method, url))
+        return super().request(method, url, **kwargs)
+
+
+def post_urls(posts):
+    return [post["post_url"] for post in posts]
+
+
+def test_pages_through_the_cursors(scraper, graphql_server):
+    posts = scraper.extract(ALICE)
+
+    assert post_urls(posts) == ["https://medium.com/@alice/post-%d" % i for i in range(1, 6)]
+    assert [operation["variables"]["homepagePostsFrom"] for operation in graphql_server.operations] == [None, "L1679380373325"]
+    assert all(operation["variables"]["username"] == "alice" for operation in graphql_server.operations)
+
+
+def test_post_fields(scraper):
+    post = scraper.extract(ALICE)[0]
+
+    assert post["author"] == "Alice"
+    assert post["author_url"] == ALICE
+    assert post["author_avatar_url"] == "https://miro.medium.com/1*alice.jpeg"
+    assert post["membership_date"] == "2021-10-07 13:55:47"
+    assert post["num_followers"] == 1200
+    assert post["v3_newsletter_subs"] == 42
+    assert post["date"] == "2023-03-23 06:32:53.325000"
+    assert post["claps"] == 100
+    assert post["tags"] == "['writing', 'tag-1']"
+
+
+def test_missing_profile_fields_are_none(scraper):
+    post = scraper.extract(BOB)[0]
+
+    assert post["membership_date"] is None
+    assert post["v3_newsletter_subs"] is None
+
+
+def test_stops_at_the_last_seen_post(scraper, graphql_server):
+    posts = scraper.extract(ALICE, stop_at="https://medium.com/@alice/post-3")
+
+    assert post_urls(posts) == ["https://medium.com/@alice/post-1", "https://medium.com/@alice/post-2"]
+    # the second page is not requested once the last seen post is on the first one
+    assert len(graphql_server.operations) == 1
+
+
+def test_batches_the_pages_of_concurrent_authors(scraper, graphql_server):
+    posts = scraper.scrape([ALICE, BOB])
+
+    assert len(posts[ALICE]) == 5
+    assert len(posts[BOB]) == 2
+    # the first pages of both authors are sent in one request, the second page of alice alone
+    assert [sorted(operation["variables"]["username"] for operation in batch) for batch in graphql_server.batches] == [
+        ["alice", "bob"],
+        ["alice"],
+    ]
+
+
+def test_batch_size_limits_the_operations_per_request(graphql_server):
+    with ProfileScraper(endpoint=graphql_server.url, batch_size=1) as scraper:
+        scraper.scrape([ALICE, BOB])
+
+    assert len(graphql_server.batches) == 3
+    assert all(len(batch) == 1 for batch in graphql_server.batches)
+
+
+def test_unknown_user_raises_lookup_error(scraper):
+    with pytest.raises(LookupError):
+        scraper.extract("https://medium.com/@nobody")
+
+
+def test_sends_the_requests_through_the_engine(graphql_server):
+    engine = RecordingEngine(workers=2)
+    with engine, ProfileScraper(engine=engine, endpoint=graphql_server.url) as scraper:
+        posts = scraper.scrape([ALICE, BOB])
+
+    assert len(posts[ALICE]) == 5
+    assert len(posts[BOB]) == 2
+    assert engine.sent == [("POST", graphql_server.url)] * len(graphql_server.batches)
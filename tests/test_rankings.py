@@ -0,0 +1,54 @@
+import pytest
+
+# data processing
+import numpy as np
+import pandas as pd
+
+from dashboard.rankings import COLUMNS_TO_ROUND, RankingIndex, top_k
+
+
+def test_top_k_matches_a_full_sort():
+    values = np.random.default_rng(0).permutation(1000).astype("float64")
+
+    assert top_k(values, 10).tolist() == np.argsort(-values)[:10].tolist()
+
+
+def test_top_k_of_fewer_values_than_k():
+    assert top_k(np.array([1, 3, 2]), 10).tolist() == [1, 2, 0]
+
+
+def test_top_k_skips_the_missing_values():
+    values = np.array([np.nan, 5.0, np.nan, 1.0, 3.0])
+
+    assert top_k(values, 2).tolist() == [1, 4]
+
+
+@pytest.fixture
+def authors():
+    return pd.DataFrame(
+        {
+            "author": ["a", "b", "c", "d"],
+            "num_articles": [5, 50, 20, 1],
+            "num_followers": [10, 20, 30, 40],
+            "average_claps": [1.234, 9.876, 5.555, np.nan],
+            "average_unique_clappers": [1.0, 2.0, 3.0, 4.0],
+            "average_reading_time": [4.0, 3.0, 2.0, 1.0],
+            "average_responses": [0.0, 1.0, 2.0, 3.0],
+            "v3_newsletter_subs": [0, 0, 0, 100],
+        }
+    )
+
+
+def test_ranking_index_keeps_the_top_rows_rounded(authors):
+    index = RankingIndex(authors, k=3)
+
+    assert index.top("num_articles", 3)["author"].tolist() == ["b", "c", "a"]
+    assert index.top("average_claps", 2)["average_claps"].tolist() == [9.88, 5.56]
+    # the frame of the store is left as it is
+    assert authors["average_claps"].iloc[0] == 1.234
+    assert set(COLUMNS_TO_ROUND) <= set(index.top("num_followers", 3).columns)
+
+
+def test_ranking_index_only_answers_up_to_k(authors):
+    with pytest.raises(ValueError):
+        RankingIndex(authors, k=3).top("num_articles", 4)
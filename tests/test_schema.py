@@ -0,0 +1,50 @@
+import os
+
+import pytest
+
+# data processing
+import pandas as pd
+
+from medium_scraper.profile import post_fields
+from medium_scraper.schema import RAW_SCHEMA, read_source
+from medium_scraper.writers import open_writer
+from pipeline import aggregate_authors, normalize, normalize_posts
+
+BOB = "https://medium.com/@bob"
+
+
+@pytest.fixture
+def bob_posts(recorded_responses):
+    # bob is not a member and has no newsletter, so the profile fields of his posts are null
+    user = recorded_responses["bob"][""]["data"]["userResult"]
+    return [normalize(post_fields(post, user, BOB), BOB) for post in user["homepagePostsConnection"]["posts"]]
+
+
+@pytest.mark.parametrize("format", ["csv", "parquet"])
+def test_null_fields_round_trip(tmp_path, bob_posts, format):
+    path = os.path.join(tmp_path, "raw_dataset.%s" % format)
+    with open_writer(path, RAW_SCHEMA, format, chunk_size=1) as writer:
+        for post in bob_posts:
+            writer.write(post)
+
+    raw = read_source(path, "raw")
+
+    assert len(raw) == 2
+    assert (raw["v3_newsletter_subs"] == 0).all()
+    assert raw["membership_date"].isna().all()
+    assert raw["claps"].tolist() == [100, 200]
+
+
+def test_normalized_layout_of_null_fields(tmp_path, bob_posts):
+    path = os.path.join(tmp_path, "raw_dataset.csv")
+    pd.DataFrame(bob_posts).to_csv(path, index=False)
+    raw = read_source(path, "raw")
+
+    profiles, posts, post_tags = normalize_posts(raw)
+    authors = aggregate_authors(raw)
+
+    assert profiles["v3_newsletter_subs"].tolist() == [0]
+    assert profiles["membership_date"].isna().all()
+    assert posts["author_id"].tolist() == [0, 0]
+    assert post_tags["tag"].tolist() == ["writing", "tag-1", "writing", "tag-2"]
+    assert authors["num_articles"].tolist() == [2]
@@ -0,0 +1,100 @@
+from concurrent.futures import Future
+
+import pytest
+
+import scraper
+from medium_scraper.state import CrawlState
+from scraper import MediumScraper, PublicationScraper
+
+PUBLICATION = "https://towardsdatascience.com/"
+EMPTY_PAGE = "<html><body></body></html>"
+
+
+class FakeResponse:
+    def __init__(self, url, status_code=200, text=""):
+        self.url = url
+        self.status_code = status_code
+        self.text = text
+        self.content = text.encode()
+
+
+class FakeEngine:
+    """Answers every url with the response of `responses`, or `page` when it has none."""
+
+    page = EMPTY_PAGE
+
+    def __init__(self, responses=None):
+        self.responses = responses or {}
+        self.requested = []
+        self.closed = False
+
+    def submit(self, url, state=None):
+        self.requested.append(url)
+        future = Future()
+        future.set_result(self.responses.get(url) or FakeResponse(url, text=self.page))
+        return future
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def engines(monkeypatch):
+    created = []
+
+    def engine():
+        created.append(FakeEngine())
+        return created[-1]
+
+    monkeypatch.setattr(scraper, "FetchEngine", engine)
+    return created
+
+
+def test_closes_the_engine_it_created(engines):
+    with PublicationScraper(PUBLICATION, rollback=1):
+        pass
+
+    assert [engine.closed for engine in engines] == [True]
+
+
+def test_closes_the_engine_it_created_when_the_setup_fails(engines, monkeypatch):
+    monkeypatch.setattr(FakeEngine, "page", "PAGE NOT FOUND 404")
+
+    with pytest.raises(NotImplementedError):
+        MediumScraper([PUBLICATION])
+
+    assert [engine.closed for engine in engines] == [True]
+
+
+def test_leaves_a_given_engine_open():
+    engine = FakeEngine()
+    with MediumScraper([PUBLICATION], engine=engine, rollback=1) as medium_scraper:
+        assert len(medium_scraper.scrapers) == 1
+
+    assert not engine.closed
+
+
+def test_marks_the_settled_months_complete():
+    state = CrawlState()
+    engine = FakeEngine()
+    publication = PublicationScraper(PUBLICATION, rollback=1, engine=engine, state=state)
+    # the archive is requested first, then the months from the newest
+    months = engine.requested[1:]
+
+    assert len(publication.data) == 2
+    # the archive of a month can not change anymore a week after its end
+    assert state.get(months[1]).get("complete")
+
+
+def test_skips_the_unchanged_and_the_completed_months():
+    engine = FakeEngine()
+    archive_url = PublicationScraper(PUBLICATION, rollback=1, engine=engine).archive_url
+    months = engine.requested[1:]
+    state = CrawlState()
+    state.update(months[1], complete=True)
+
+    engine = FakeEngine({months[0]: FakeResponse(months[0], status_code=304)})
+    publication = PublicationScraper(PUBLICATION, rollback=1, engine=engine, state=state)
+
+    assert engine.requested == [archive_url, months[0]]
+    assert publication.data == {}
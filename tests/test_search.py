@@ -0,0 +1,61 @@
+import pytest
+
+# data processing
+import numpy as np
+import pandas as pd
+
+from dashboard.columns import TABLE_COLUMNS
+from dashboard.search import AuthorIndex
+
+
+@pytest.fixture
+def index():
+    authors = pd.DataFrame(
+        {
+            "author": ["Tim Denning", "Hasan Aboul Hasan", None, "Thanos"],
+            "num_articles": [2561, 120, 7, 45],
+            "num_followers": [314216, 1200, 30, 5000],
+            "average_claps": [2496.381, 12.5, np.nan, 300.0],
+            "average_unique_clappers": [100.0, 2.0, 1.0, 30.0],
+            "average_reading_time": [4.2, 6.0, 3.0, 5.5],
+            "average_responses": [20.0, 1.0, 0.0, 3.0],
+            "v3_newsletter_subs": [3373, 0, 0, 12],
+            # authors that are not members have no membership date
+            "membership_date": ["2021-10-07 13:55:47", None, "2022-01-01 00:00:00", None],
+        }
+    )
+    return AuthorIndex(authors[TABLE_COLUMNS])
+
+
+def sort_by(column, direction):
+    return [{"column_id": column, "direction": direction}]
+
+
+@pytest.mark.parametrize("direction", ["asc", "desc"])
+def test_missing_values_sort_last(index, direction):
+    rows, _ = index.page(sort_by=sort_by("membership_date", direction))
+
+    assert rows["membership_date"].isna().tolist() == [False, False, True, True]
+    dates = rows["membership_date"].dropna().tolist()
+    assert dates == sorted(dates, reverse=direction == "desc")
+
+
+@pytest.mark.parametrize("direction", ["asc", "desc"])
+def test_missing_values_sort_last_within_a_search(index, direction):
+    rows, _ = index.page("t", sort_by=sort_by("author", direction), page_size=1)
+
+    assert rows["author"].tolist() == (["Thanos"] if direction == "asc" else ["Tim Denning"])
+
+
+def test_sorts_numbers_with_missing_values(index):
+    rows, page_count = index.page(sort_by=sort_by("average_claps", "desc"), page_size=2, page_current=1)
+
+    assert rows["author"].tolist() == ["Hasan Aboul Hasan", None]
+    assert page_count == 2
+
+
+def test_search_and_filter(index):
+    rows, page_count = index.page("hasan", filter_query="{num_articles} s> 100")
+
+    assert rows["author"].tolist() == ["Hasan Aboul Hasan"]
+    assert page_count == 1
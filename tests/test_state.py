@@ -0,0 +1,61 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from medium_scraper.fetch import FetchEngine
+from medium_scraper.state import CrawlState
+
+
+class ConditionalHandler(BaseHTTPRequestHandler):
+    """Serves a page with an ETag and answers 304 to the requests that already have it."""
+
+    def do_GET(self):
+        if self.headers.get("If-None-Match") == '"v1"':
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = b"<html></html>"
+        self.send_response(200)
+        self.send_header("ETag", '"v1"')
+        self.send_header("Last-Modified", "Wed, 21 Oct 2015 07:28:00 GMT")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def page_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ConditionalHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield "http://127.0.0.1:%d/archive/2023/03" % server.server_address[1]
+    server.shutdown()
+    server.server_close()
+
+
+def test_saves_and_loads_the_entries(tmp_path):
+    path = str(tmp_path / "state.json")
+    state = CrawlState(path)
+    state.update("https://alice.medium.com/", last_post_url="https://medium.com/@alice/post-1", last_post_date=None)
+    state.save()
+
+    assert CrawlState(path).get("https://alice.medium.com/") == {"last_post_url": "https://medium.com/@alice/post-1"}
+    assert not (tmp_path / "state.json.tmp").exists()
+
+
+def test_headers_of_a_page_never_fetched():
+    assert CrawlState().headers("https://towardsdatascience.com/archive") == {}
+
+
+def test_conditional_requests_are_not_modified(page_url):
+    state = CrawlState()
+    with FetchEngine(workers=1) as engine:
+        first = engine.get(page_url, state=state)
+        second = engine.get(page_url, state=state)
+
+    assert first.status_code == 200
+    assert state.headers(page_url) == {"If-None-Match": '"v1"', "If-Modified-Since": "Wed, 21 Oct 2015 07:28:00 GMT"}
+    assert second.status_code == 304
@@ -0,0 +1,34 @@
+import os
+import shutil
+
+import pytest
+
+from dashboard.store import DatasetStore
+from medium_scraper.schema import DATASETS
+
+DATASET_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "datasets")
+PUBLICATION = "https://towardsdatascience.com/"
+
+
+@pytest.fixture
+def store(tmp_path):
+    shutil.copy(os.path.join(DATASET_DIR, "processed_dataset.csv"), tmp_path)
+    return DatasetStore(str(tmp_path), {"processed": DATASETS["processed"]})
+
+
+def test_close_database_reopens_on_the_next_read(store):
+    database = store.database()
+    articles = database.publication_articles(PUBLICATION)
+    store.close_database()
+
+    assert store.database() is not database
+    assert store.database().publication_articles(PUBLICATION).equals(articles)
+
+
+def test_preload_skips_the_datasets_without_readers(store, tmp_path):
+    shutil.copy(os.path.join(DATASET_DIR, "authors_processed.csv"), tmp_path)
+    store.datasets = {name: DATASETS[name] for name in ("processed", "authors")}
+    store.register("publications", lambda frame: frame["publication_url"].unique(), source="processed")
+    store.preload()
+
+    assert sorted(store._frames) == ["processed"]